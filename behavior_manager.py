@@ -75,6 +75,15 @@ class BehaviorManager:
         """取得行走方向"""
         return self.walk_direction
     
+    def force_flip_direction(self, direction):
+        """
+        強制設定行走方向（當碰到螢幕邊界時）
+
+        Args:
+            direction: 'left' 或 'right'
+        """
+        self.walk_direction = direction
+
     def reverse_direction(self):
         """反轉行走方向（當碰到螢幕邊界時）"""
         if self.walk_direction == 'left':
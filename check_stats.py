@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+狀態封閉形式驗證
+Check closed-form stat advancement against per-second ticking
+
+PetStats.advance 與 PetStatsBatch.advance 以封閉形式一次推進多秒，
+這裡以逐秒呼叫 PetStats._step 的迴圈為參考，比對隨機值與門檻附近的邊界值
+（如精力 30.04、飢餓剛好 20）。參考迴圈以 Fraction 精確計算，
+因為浮點逐秒累加在剛好落在門檻時本身就會差一步。
+
+用法：
+    python check_stats.py [--trials N] [--seed S]
+差距超過容許值時以非零狀態結束。
+"""
+
+import argparse
+import random
+from fractions import Fraction
+
+from modules.pet_stats import PetStats
+from modules.pet_stats_batch import DEFAULT_DECAY_RATES, STATS, PetStatsBatch
+
+TOLERANCE = 1e-6
+BOUNDARY_VALUES = ['0', '19.95', '20', '20.02', '20.05', '29.95', '29.96', '30', '30.04', '30.05', '100']
+BOUNDARY_TICKS = (1, 2, 3, 100, 1000)
+
+
+def make_cases(trials, seed):
+    """
+    產生測試案例：每個邊界值搭配固定步數，再加上隨機案例
+
+    Returns:
+        list: [((hunger, happiness, health, energy), 步數), ...]（數值為十進位字串）
+    """
+    rng = random.Random(seed)
+    cases = [((value,) * len(STATS), n) for value in BOUNDARY_VALUES for n in BOUNDARY_TICKS]
+    for _ in range(trials):
+        values = tuple(rng.choice([f'{rng.uniform(0, 100):.2f}', rng.choice(BOUNDARY_VALUES)])
+                       for _ in STATS)
+        cases.append((values, rng.randint(1, 1000)))
+    return cases
+
+
+def compare_with_ticking(cases):
+    """
+    比對封閉形式與逐秒更新
+
+    Returns:
+        float: 所有案例中與逐秒結果的最大差距
+    """
+    # 參考：規則常數與衰減率都換成 Fraction
+    reference, closed = PetStats(), PetStats()
+    for name in ('LOW_HUNGER', 'LOW_HEALTH', 'LOW_ENERGY', 'PENALTY_RATE', 'ENERGY_RECOVERY_RATE'):
+        setattr(reference, name, Fraction(str(getattr(PetStats, name))))
+    for stat, rate in DEFAULT_DECAY_RATES.items():
+        reference.decay_rates[stat] = Fraction(str(rate))
+
+    worst = 0.0
+    for values, n in cases:
+        batch = PetStatsBatch(1)
+        for stat, value in zip(STATS, values):
+            setattr(reference, stat, Fraction(value))
+            setattr(closed, stat, float(value))
+            getattr(batch, stat)[0] = float(value)
+
+        for _ in range(n):
+            reference._step(1)
+        closed.advance(n)
+        batch.advance(n)
+
+        for stat in STATS:
+            expected = float(getattr(reference, stat))
+            worst = max(worst, abs(getattr(closed, stat) - expected),
+                        abs(float(getattr(batch, stat)[0]) - expected))
+    return worst
+
+
+def main():
+    """主程式"""
+    parser = argparse.ArgumentParser(description="驗證狀態封閉形式與逐秒更新一致")
+    parser.add_argument('--trials', type=int, default=100, help="隨機案例數")
+    parser.add_argument('--seed', type=int, default=0, help="亂數種子")
+    args = parser.parse_args()
+
+    cases = make_cases(args.trials, args.seed)
+    diff = compare_with_ticking(cases)
+    ok = diff < TOLERANCE
+    print(f"{'✓' if ok else '✗'} {len(cases)} 個案例，封閉形式與逐秒更新的最大差距: {diff:.3g}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,18 +10,26 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
 
-# 當前使用的寵物（可修改此值來切換寵物）
+# 當前使用的寵物（可修改此值來切換寵物，換色變體由 generate_variants.py 產生）
 CURRENT_PET = 'default_cat'
 
 # 寵物素材路徑
 PET_ASSETS_DIR = os.path.join(ASSETS_DIR, CURRENT_PET)
 
+# 換色變體定義（generate_variants.py 與執行中切換寵物共用）
+PET_VARIANTS_FILE = os.path.join(BASE_DIR, 'data', 'pet_variants.json')
+
+# 已解碼幀快取（素材或動畫設定變更時自動失效）
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+FRAME_CACHE_FILE = os.path.join(CACHE_DIR, f'{CURRENT_PET}.frames')
+
 # 視窗設定
 WINDOW_WIDTH = 128
 WINDOW_HEIGHT = 128
 WINDOW_ALWAYS_ON_TOP = True
+CLICK_THROUGH_TRANSPARENT = True  # 透明像素不攔截滑鼠（依每幀 alpha 設定視窗遮罩）
 
-# 動畫設定
+# 動畫設定（預設值；各寵物的實際幀數由 assets/<pet>/manifest.json 決定）
 ANIMATION_SPEED = 100  # 毫秒，每幀之間的間隔
 ANIMATION_STATES = {
     'idle': {
@@ -76,9 +84,31 @@ MIRROR_ANIMATIONS = {
     'walk_left': 'walk_right',
 }
 
+# 缺少素材時直接在記憶體中生成（預設貓與換色變體），並於背景寫成 PNG
+GENERATE_MISSING_ASSETS = True
+PERSIST_GENERATED_ASSETS = True
+
+# 切換寵物時每次事件迴圈轉換成 QPixmap 的幀數（分批進行，避免卡住動畫與拖曳）
+PET_SWITCH_BATCH_SIZE = 4
+
+# 常駐 QPixmap 的記憶體預算（位元組），超過時釋放最久未使用的動畫
+ANIMATION_MEMORY_BUDGET = 8 * 1024 * 1024
+
 # 可選動畫 (如果缺少，將使用 idle 替代)
 OPTIONAL_ANIMATIONS = ['sleep', 'sit', 'eat', 'play', 'happy', 'sad']
 
+# 素材清單（不存在時掃描目錄自動產生）
+ASSET_MANIFEST_FILE = 'manifest.json'
+
+# 精靈圖集設定（由 pack_atlas.py 產生，存在時優先載入）
+ATLAS_IMAGE_FILE = 'atlas.png'
+ATLAS_INDEX_FILE = 'atlas.json'
+ATLAS_MAX_WIDTH = 1024  # 圖集最大寬度（像素）
+
+# 排程設定
+TICK_COALESCE_TOLERANCE = 5  # 毫秒，此範圍內到期的任務合併在同一次喚醒執行
+STATS_UPDATE_INTERVAL = 1000  # 毫秒，寵物或面板可見時的狀態更新間隔
+
 # 行為設定
 BEHAVIOR_UPDATE_INTERVAL = 3000  # 毫秒，行為更新間隔
 BEHAVIOR_PROBABILITIES = {
@@ -89,7 +119,7 @@ BEHAVIOR_PROBABILITIES = {
 }
 
 # 移動設定
-MOVE_SPEED = 2  # 像素/幀
+MOVE_SPEED = 125  # 像素/秒（行走動畫的移動速度）
 WALK_DURATION_MIN = 2000  # 毫秒
 WALK_DURATION_MAX = 5000  # 毫秒
 
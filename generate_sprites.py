@@ -4,11 +4,34 @@ Generate simple cat sprites for desktop pet
 生成簡單的貓咪精靈圖
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import functools
+import hashlib
+import json
 import os
 
+import numpy as np
+
+import config
+from modules import sprite_compositor
+from modules.asset_manifest import write_asset
+from modules.sprite_compositor import Layer, compose
+from pack_atlas import pack_atlas
+
 # 建立輸出目錄
-BASE_DIR = "assets/default_cat"
+PET_NAME = 'default_cat'
+BASE_DIR = f"assets/{PET_NAME}"
+
+# 換色變體定義（generate_variants.py 與執行期生成共用）
+VARIANTS_SPEC_PATH = config.PET_VARIANTS_FILE
+
+# 建置清單：記錄每一幀的指紋與輸出檔的大小/mtime，兩者都未改變的幀不重繪
+MANIFEST_PATH = os.path.join(BASE_DIR, '.build_manifest.json')
+
+# 待重建的幀少於此數時直接在本行程繪製（啟動行程池的成本高於平行的收益）
+PARALLEL_MIN_JOBS = 64
 
 # 尺寸
 SIZE = (128, 128)
@@ -21,221 +44,502 @@ EYE_COLOR = (0, 0, 0, 255)  # 黑色眼睛
 NOSE_COLOR = (255, 192, 203, 255)  # 粉紅色鼻子
 ITEM_COLOR = (255, 100, 100, 255)  # 物品顏色（紅蘋果/球）
 
+# 調色盤：各顏色角色的預設值（變體只需覆寫其中幾個）
+PALETTE = {
+    'cat': CAT_COLOR,
+    'spot': SPOT_COLOR,
+    'eye': EYE_COLOR,
+    'nose': NOSE_COLOR,
+    'apple': (255, 50, 50, 255),
+    'stem': (0, 100, 0, 255),
+    'ball': (50, 50, 255, 255),
+    'heart': (255, 0, 0, 255),
+    'tear': (100, 100, 255, 255),
+}
+
+# 部件以「索引色」繪製：R 通道記錄角色索引（0 保留給透明背景），
+# 幀先合成為索引遮罩，再以調色盤查表轉成 RGBA，換色只需換一張表
+ROLES = ['background'] + list(PALETTE)
+K = {role: (i, 0, 0, 255) for i, role in enumerate(ROLES)}
+
+
+def palette_lut(overrides=None):
+    """
+    建立索引 → RGBA 查找表
 
-def draw_cat_base(draw, offset_y=0, sitting=False, happy=False, sad=False):
-    """繪製貓的基本形狀"""
-    # 身體
+    Args:
+        overrides: {角色: 顏色}，顏色可為 [r, g, b, a] 或 "#rrggbb"
+
+    Returns:
+        np.ndarray: (len(ROLES), 4) uint8
+    """
+    colors = dict(PALETTE)
+    for role, color in (overrides or {}).items():
+        if role not in colors:
+            raise ValueError(f"未知的顏色角色: {role}")
+        if isinstance(color, str):
+            value = color.lstrip('#')
+            color = [int(value[j:j + 2], 16) for j in range(0, len(value), 2)]
+        colors[role] = tuple(color) + (255,) * (4 - len(color))
+
+    lut = np.zeros((len(ROLES), 4), np.uint8)
+    lut[0] = BG_COLOR
+    for i, role in enumerate(ROLES[1:], start=1):
+        lut[i] = colors[role]
+    return lut
+
+
+# ─────────────────────────────────────────
+# 部件繪製（座標以未位移的畫布為準，顏色使用索引色 K）
+# ─────────────────────────────────────────
+def draw_body(draw, sitting=False):
+    """身體"""
     if sitting:
         # 坐姿：橢圓形身體
-        draw.ellipse([30, 50+offset_y, 98, 110+offset_y], fill=CAT_COLOR)
+        draw.ellipse([30, 50, 98, 110], fill=K['cat'])
     else:
         # 站姿：橢圓形身體
-        draw.ellipse([25, 60+offset_y, 103, 100+offset_y], fill=CAT_COLOR)
-    
-    # 頭部
-    draw.ellipse([38, 30+offset_y, 90, 75+offset_y], fill=CAT_COLOR)
+        draw.ellipse([25, 60, 103, 100], fill=K['cat'])
+
+
+def draw_head(draw, sad=False):
+    """頭部與耳朵"""
+    draw.ellipse([38, 30, 90, 75], fill=K['cat'])
     
     # 耳朵（三角形）
     if sad:
         # 難過時耳朵下垂
-        draw.polygon([(38, 45+offset_y), (45, 55+offset_y), (50, 40+offset_y)], fill=CAT_COLOR)
-        draw.polygon([(78, 40+offset_y), (83, 55+offset_y), (90, 45+offset_y)], fill=CAT_COLOR)
+        draw.polygon([(38, 45), (45, 55), (50, 40)], fill=K['cat'])
+        draw.polygon([(78, 40), (83, 55), (90, 45)], fill=K['cat'])
     else:
-        draw.polygon([(42, 40+offset_y), (50, 25+offset_y), (58, 40+offset_y)], fill=CAT_COLOR)
-        draw.polygon([(70, 40+offset_y), (78, 25+offset_y), (86, 40+offset_y)], fill=CAT_COLOR)
-    
-    # 眼睛
-    if happy:
+        draw.polygon([(42, 40), (50, 25), (58, 40)], fill=K['cat'])
+        draw.polygon([(70, 40), (78, 25), (86, 40)], fill=K['cat'])
+
+
+def draw_eyes(draw, style='normal'):
+    """眼睛：normal / happy / sad"""
+    if style == 'happy':
         # 開心眼 ^ ^
-        draw.line([(48, 55+offset_y), (51, 50+offset_y), (55, 55+offset_y)], fill=EYE_COLOR, width=2)
-        draw.line([(73, 55+offset_y), (76, 50+offset_y), (80, 55+offset_y)], fill=EYE_COLOR, width=2)
-    elif sad:
+        draw.line([(48, 55), (51, 50), (55, 55)], fill=K['eye'], width=2)
+        draw.line([(73, 55), (76, 50), (80, 55)], fill=K['eye'], width=2)
+    elif style == 'sad':
         # 難過眼 T T
-        draw.line([(48, 52+offset_y), (55, 52+offset_y)], fill=EYE_COLOR, width=2)
-        draw.line([(51, 52+offset_y), (51, 58+offset_y)], fill=EYE_COLOR, width=2)
-        draw.line([(73, 52+offset_y), (80, 52+offset_y)], fill=EYE_COLOR, width=2)
-        draw.line([(76, 52+offset_y), (76, 58+offset_y)], fill=EYE_COLOR, width=2)
+        draw.line([(48, 52), (55, 52)], fill=K['eye'], width=2)
+        draw.line([(51, 52), (51, 58)], fill=K['eye'], width=2)
+        draw.line([(73, 52), (80, 52)], fill=K['eye'], width=2)
+        draw.line([(76, 52), (76, 58)], fill=K['eye'], width=2)
     else:
         # 正常眼
-        draw.ellipse([48, 48+offset_y, 55, 58+offset_y], fill=EYE_COLOR)
-        draw.ellipse([73, 48+offset_y, 80, 58+offset_y], fill=EYE_COLOR)
-    
-    # 鼻子
-    draw.ellipse([61, 60+offset_y, 67, 65+offset_y], fill=NOSE_COLOR)
-    
-    # 斑點
-    draw.ellipse([75, 35+offset_y, 85, 45+offset_y], fill=SPOT_COLOR)
-    
-    if not sitting:
-        # 腿（只在站立時顯示）
-        draw.rectangle([35, 95+offset_y, 43, 110+offset_y], fill=CAT_COLOR)
-        draw.rectangle([52, 95+offset_y, 60, 110+offset_y], fill=CAT_COLOR)
-        draw.rectangle([68, 95+offset_y, 76, 110+offset_y], fill=CAT_COLOR)
-        draw.rectangle([85, 95+offset_y, 93, 110+offset_y], fill=CAT_COLOR)
-    
-    # 尾巴
+        draw.ellipse([48, 48, 55, 58], fill=K['eye'])
+        draw.ellipse([73, 48, 80, 58], fill=K['eye'])
+
+
+def draw_face(draw):
+    """鼻子與斑點"""
+    draw.ellipse([61, 60, 67, 65], fill=K['nose'])
+    draw.ellipse([75, 35, 85, 45], fill=K['spot'])
+
+
+def draw_legs(draw):
+    """腿（只在站立時顯示）"""
+    draw.rectangle([35, 95, 43, 110], fill=K['cat'])
+    draw.rectangle([52, 95, 60, 110], fill=K['cat'])
+    draw.rectangle([68, 95, 76, 110], fill=K['cat'])
+    draw.rectangle([85, 95, 93, 110], fill=K['cat'])
+
+
+def draw_tail(draw, sitting=False):
+    """尾巴"""
     if sitting:
         # 坐姿尾巴（捲曲）
-        draw.arc([88, 55+offset_y, 118, 95+offset_y], 180, 360, fill=CAT_COLOR, width=8)
+        draw.arc([88, 55, 118, 95], 180, 360, fill=K['cat'], width=8)
     else:
         # 站姿尾巴
-        draw.arc([90, 65+offset_y, 120, 95+offset_y], 180, 360, fill=CAT_COLOR, width=6)
+        draw.arc([90, 65, 120, 95], 180, 360, fill=K['cat'], width=6)
 
 
-def create_idle_frames():
-    """建立閒置動畫幀"""
-    print("正在生成閒置動畫...")
-    img = Image.new('RGBA', SIZE, BG_COLOR)
-    draw = ImageDraw.Draw(img)
-    draw_cat_base(draw)
-    img.save(os.path.join(BASE_DIR, 'idle', '0.png'))
-    
-    img = Image.new('RGBA', SIZE, BG_COLOR)
-    draw = ImageDraw.Draw(img)
-    draw_cat_base(draw, offset_y=-2)
-    img.save(os.path.join(BASE_DIR, 'idle', '1.png'))
-
-
-def create_walk_frames(direction='right'):
-    """建立行走動畫幀"""
-    print(f"正在生成向{direction}行走動畫...")
-    folder = f'walk_{direction}'
-    for i in range(4):
-        img = Image.new('RGBA', SIZE, BG_COLOR)
-        draw = ImageDraw.Draw(img)
-        offset_y = -3 if i % 2 == 0 else 0
-        draw_cat_base(draw, offset_y=offset_y)
-        if direction == 'left':
-            img = img.transpose(Image.FLIP_LEFT_RIGHT)
-        img.save(os.path.join(BASE_DIR, folder, f'{i}.png'))
-
-
-def create_sleep_frames():
-    """建立睡覺動畫幀"""
-    print("正在生成睡覺動畫...")
-    for i in range(2):
-        img = Image.new('RGBA', SIZE, BG_COLOR)
-        draw = ImageDraw.Draw(img)
-        # 躺下的貓
-        draw.ellipse([20, 60, 108, 90], fill=CAT_COLOR)
-        draw.ellipse([85, 50, 118, 78], fill=CAT_COLOR)
-        draw.polygon([(90, 55), (95, 45), (100, 55)], fill=CAT_COLOR)
-        draw.polygon([(105, 55), (110, 45), (115, 55)], fill=CAT_COLOR)
-        if i == 0:
-            draw.line([(92, 62), (98, 62)], fill=EYE_COLOR, width=2)
-            draw.line([(105, 62), (111, 62)], fill=EYE_COLOR, width=2)
+def draw_sleeping_body(draw):
+    """躺下的貓（眼睛以外的部分）"""
+    draw.ellipse([20, 60, 108, 90], fill=K['cat'])
+    draw.ellipse([85, 50, 118, 78], fill=K['cat'])
+    draw.polygon([(90, 55), (95, 45), (100, 55)], fill=K['cat'])
+    draw.polygon([(105, 55), (110, 45), (115, 55)], fill=K['cat'])
+
+
+def draw_sleeping_eyes(draw, closed=True):
+    """睡覺時的眼睛"""
+    if closed:
+        draw.line([(92, 62), (98, 62)], fill=K['eye'], width=2)
+        draw.line([(105, 62), (111, 62)], fill=K['eye'], width=2)
+    else:
+        draw.ellipse([92, 61, 98, 63], fill=K['eye'])
+        draw.ellipse([105, 61, 111, 63], fill=K['eye'])
+
+
+def draw_sleeping_details(draw):
+    """睡覺時的鼻子、斑點與尾巴"""
+    draw.ellipse([99, 68, 103, 71], fill=K['nose'])
+    draw.ellipse([95, 52, 102, 58], fill=K['spot'])
+    draw.arc([15, 65, 35, 85], 90, 270, fill=K['cat'], width=5)
+
+
+def draw_apple(draw):
+    """蘋果（y=0 為蘋果頂端，使用時再位移）"""
+    draw.ellipse([80, 0, 100, 20], fill=K['apple'])
+    draw.line([(90, 0), (90, -5)], fill=K['stem'], width=2)
+
+
+def draw_ball(draw):
+    """球（x=0 為球左側，使用時再位移）"""
+    draw.ellipse([0, 90, 20, 110], fill=K['ball'])
+
+
+def draw_heart(draw):
+    """愛心 (用圖形繪製)"""
+    # 左圓
+    draw.ellipse([95, 30, 105, 40], fill=K['heart'])
+    # 右圓
+    draw.ellipse([105, 30, 115, 40], fill=K['heart'])
+    # 下方三角形
+    draw.polygon([(95, 35), (115, 35), (105, 45)], fill=K['heart'])
+
+
+def draw_tears(draw):
+    """淚水"""
+    draw.ellipse([50, 60, 53, 65], fill=K['tear'])
+    draw.ellipse([75, 60, 78, 65], fill=K['tear'])
+
+
+@functools.lru_cache(maxsize=None)
+def layers():
+    """
+    所有部件只光柵化一次（每個行程各一份）
+
+    Returns:
+        dict: {部件名稱: Layer}
+    """
+    def layer(fn, **kwargs):
+        return Layer.rasterize(lambda draw: fn(draw, **kwargs), SIZE)
+
+    return {
+        'body': layer(draw_body),
+        'body_sitting': layer(draw_body, sitting=True),
+        'head': layer(draw_head),
+        'head_sad': layer(draw_head, sad=True),
+        'eyes': layer(draw_eyes),
+        'eyes_happy': layer(draw_eyes, style='happy'),
+        'eyes_sad': layer(draw_eyes, style='sad'),
+        'face': layer(draw_face),
+        'legs': layer(draw_legs),
+        'tail': layer(draw_tail),
+        'tail_sitting': layer(draw_tail, sitting=True),
+        'sleeping_body': layer(draw_sleeping_body),
+        'sleeping_eyes_closed': layer(draw_sleeping_eyes),
+        'sleeping_eyes_open': layer(draw_sleeping_eyes, closed=False),
+        'sleeping_details': layer(draw_sleeping_details),
+        'apple': layer(draw_apple),
+        'ball': layer(draw_ball),
+        'heart': layer(draw_heart),
+        'tears': layer(draw_tears),
+    }
+
+
+def to_index(frame):
+    """將以索引色合成的 RGBA 幀轉成 (h, w) 索引遮罩"""
+    return np.ascontiguousarray(frame[..., 0])
+
+
+def cat_layers(offset_y=0, sitting=False, happy=False, sad=False):
+    """
+    貓的基本形狀（依繪製順序列出部件與位移）
+
+    Returns:
+        list: [(Layer, dx, dy), ...]
+    """
+    L = layers()
+    eyes = 'eyes_happy' if happy else 'eyes_sad' if sad else 'eyes'
+    parts = [
+        'body_sitting' if sitting else 'body',
+        'head_sad' if sad else 'head',
+        eyes,
+        'face',
+    ]
+    if not sitting:
+        parts.append('legs')
+    parts.append('tail_sitting' if sitting else 'tail')
+    return [(L[name], 0, offset_y) for name in parts]
+
+
+def idle_frame(i):
+    """閒置動畫幀"""
+    return to_index(compose(SIZE, cat_layers(offset_y=-2 if i == 1 else 0)))
+
+
+def walk_frame(i, direction='right'):
+    """行走動畫幀"""
+    offset_y = -3 if i % 2 == 0 else 0
+    frame = to_index(compose(SIZE, cat_layers(offset_y=offset_y)))
+    if direction == 'left':
+        frame = np.ascontiguousarray(frame[:, ::-1])
+    return frame
+
+
+def sleep_frame(i):
+    """睡覺動畫幀"""
+    L = layers()
+    eyes = L['sleeping_eyes_closed'] if i == 0 else L['sleeping_eyes_open']
+    return to_index(compose(SIZE, [(L['sleeping_body'], 0, 0), (eyes, 0, 0),
+                                   (L['sleeping_details'], 0, 0)]))
+
+
+def sit_frame(i):
+    """坐下幀"""
+    return to_index(compose(SIZE, cat_layers(sitting=True)))
+
+
+def eat_frame(i):
+    """吃東西動畫幀"""
+    apple_y = 90 if i == 0 else 85  # 蘋果上下動
+    return to_index(compose(SIZE, cat_layers(sitting=True) + [(layers()['apple'], 0, apple_y)]))
+
+
+def play_frame(i):
+    """玩耍動畫幀"""
+    offset_y = -10 if i == 1 else 0  # 跳躍
+    ball_x = 100 if i == 0 else 105
+    return to_index(compose(SIZE, cat_layers(offset_y=offset_y, happy=True)
+                            + [(layers()['ball'], ball_x, 0)]))
+
+
+def happy_frame(i):
+    """開心動畫幀"""
+    offset_y = -5 if i == 1 else 0  # 輕微跳動
+    placements = cat_layers(offset_y=offset_y, happy=True)
+    if i == 1:
+        placements.append((layers()['heart'], 0, 0))
+    return to_index(compose(SIZE, placements))
+
+
+def sad_frame(i):
+    """難過動畫幀"""
+    placements = cat_layers(sad=True)
+    if i == 1:
+        placements.append((layers()['tears'], 0, 0))
+    return to_index(compose(SIZE, placements))
+
+
+# 各動畫的繪製工作：(資料夾, 幀數, 繪製函式名稱, 額外參數)
+FRAME_SPECS = [
+    ('idle', 2, 'idle_frame', {}),
+    ('walk_right', 4, 'walk_frame', {'direction': 'right'}),
+    ('walk_left', 4, 'walk_frame', {'direction': 'left'}),
+    ('sleep', 2, 'sleep_frame', {}),
+    ('sit', 1, 'sit_frame', {}),
+    ('eat', 2, 'eat_frame', {}),
+    ('play', 2, 'play_frame', {}),
+    ('happy', 2, 'happy_frame', {}),
+    ('sad', 2, 'sad_frame', {}),
+]
+
+
+def frame_jobs():
+    """
+    展開所有幀的繪製工作
+
+    Returns:
+        list: [(資料夾, 幀索引, 繪製函式名稱, 額外參數), ...]
+    """
+    return [(folder, i, renderer, params)
+            for folder, count, renderer, params in FRAME_SPECS
+            for i in range(count)]
+
+
+def script_hash():
+    """本腳本與合成引擎的雜湊（繪製程式碼或顏色改變時，所有幀都需重建）"""
+    h = hashlib.sha1()
+    for path in (__file__, sprite_compositor.__file__):
+        with open(os.path.abspath(path), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def job_fingerprint(job, code_hash):
+    """計算單一幀的指紋：腳本雜湊 + 繪製參數"""
+    payload = json.dumps([code_hash, job], sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def render_index(job):
+    """繪製單一幀的索引遮罩"""
+    folder, i, renderer, params = job
+    return globals()[renderer](i, **params)
+
+
+def render_index_frames():
+    """
+    繪製所有幀的索引遮罩（換色變體共用）
+
+    Returns:
+        dict: {資料夾: [(h, w) uint8 索引遮罩, ...]}
+    """
+    frames = {}
+    for job in frame_jobs():
+        frames.setdefault(job[0], []).append(render_index(job))
+    return frames
+
+
+def render_frames(overrides=None):
+    """
+    產生所有幀的 RGBA 陣列，不經過 PNG 編碼/寫檔（供程式直接匯入使用）
+
+    Args:
+        overrides: 調色盤覆寫 {角色: 顏色}
+
+    Returns:
+        dict: {資料夾: [(h, w, 4) uint8 RGBA, ...]}
+    """
+    lut = palette_lut(overrides)
+    return {folder: [lut[frame] for frame in frames]
+            for folder, frames in render_index_frames().items()}
+
+
+def load_variants(path=VARIANTS_SPEC_PATH):
+    """
+    讀取換色變體定義
+
+    Returns:
+        dict: {變體名稱: {角色: 顏色}}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pet_palette(pet):
+    """
+    取得寵物的調色盤覆寫
+
+    Args:
+        pet: 寵物名稱
+
+    Returns:
+        dict: 調色盤覆寫；此生成器畫不出該寵物時回傳 None
+    """
+    if pet == PET_NAME:
+        return {}
+    try:
+        return load_variants().get(pet)
+    except (OSError, ValueError):
+        return None
+
+
+def render_job(job):
+    """
+    繪製並儲存單一幀（在工作行程中執行）
+
+    Returns:
+        str: 輸出檔案的相對路徑
+    """
+    folder, i, renderer, params = job
+    img = Image.fromarray(palette_lut()[render_index(job)], 'RGBA')
+    rel_path = f"{folder}/{i}.png"
+    write_asset(os.path.join(BASE_DIR, rel_path), lambda tmp: img.save(tmp, format='PNG'))
+    return rel_path
+
+
+def output_stat(rel_path):
+    """
+    取得輸出檔的 [大小, mtime]（手動修改或損毀的檔案會不一致而重建）
+
+    Returns:
+        list: [大小, mtime_ns]；檔案不存在時回傳 None
+    """
+    try:
+        st = os.stat(os.path.join(BASE_DIR, rel_path))
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_manifest():
+    """讀取建置清單 {相對路徑: {"fingerprint": 指紋, "output": [大小, mtime]}}"""
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(jobs_count=None, force=False):
+    """
+    增量建置：只重繪指紋改變、輸出檔遺失或被改動的幀，數量多時以行程池平行處理
+
+    Args:
+        jobs_count: 工作行程數（預設為 CPU 數，待重建幀數少於 PARALLEL_MIN_JOBS 時為 1）
+        force: 忽略清單，全部重建
+
+    Returns:
+        int: 重建的幀數
+    """
+    code_hash = script_hash()
+    manifest = {} if force else load_manifest()
+
+    pending = []
+    fingerprints = {}
+    for job in frame_jobs():
+        folder, i = job[0], job[1]
+        rel_path = f"{folder}/{i}.png"
+        fingerprints[rel_path] = job_fingerprint(job, code_hash)
+        entry = manifest.get(rel_path)
+        if (not isinstance(entry, dict)
+                or entry.get('fingerprint') != fingerprints[rel_path]
+                or entry.get('output') != output_stat(rel_path)):
+            pending.append(job)
+
+    if not pending:
+        print("所有幀皆為最新，略過繪製")
+    else:
+        if jobs_count is None:
+            jobs_count = os.cpu_count() if len(pending) >= PARALLEL_MIN_JOBS else 1
+        workers = max(1, min(jobs_count or 1, len(pending)))
+        print(f"需重建 {len(pending)}/{len(fingerprints)} 幀（{workers} 個工作行程）...")
+        if workers == 1:
+            done = [render_job(job) for job in pending]
         else:
-            draw.ellipse([92, 61, 98, 63], fill=EYE_COLOR)
-            draw.ellipse([105, 61, 111, 63], fill=EYE_COLOR)
-        draw.ellipse([99, 68, 103, 71], fill=NOSE_COLOR)
-        draw.ellipse([95, 52, 102, 58], fill=SPOT_COLOR)
-        draw.arc([15, 65, 35, 85], 90, 270, fill=CAT_COLOR, width=5)
-        img.save(os.path.join(BASE_DIR, 'sleep', f'{i}.png'))
-
-
-def create_sit_frame():
-    """建立坐下幀"""
-    print("正在生成坐下動畫...")
-    img = Image.new('RGBA', SIZE, BG_COLOR)
-    draw = ImageDraw.Draw(img)
-    draw_cat_base(draw, sitting=True)
-    img.save(os.path.join(BASE_DIR, 'sit', '0.png'))
-
-
-def create_eat_frames():
-    """建立吃東西動畫"""
-    print("正在生成吃東西動畫...")
-    for i in range(2):
-        img = Image.new('RGBA', SIZE, BG_COLOR)
-        draw = ImageDraw.Draw(img)
-        draw_cat_base(draw, sitting=True)
-        
-        # 畫一個蘋果
-        apple_y = 90 if i == 0 else 85  # 蘋果上下動
-        draw.ellipse([80, apple_y, 100, apple_y+20], fill=(255, 50, 50, 255))
-        draw.line([(90, apple_y), (90, apple_y-5)], fill=(0, 100, 0, 255), width=2)
-        
-        img.save(os.path.join(BASE_DIR, 'eat', f'{i}.png'))
-
-
-def create_play_frames():
-    """建立玩耍動畫"""
-    print("正在生成玩耍動畫...")
-    for i in range(2):
-        img = Image.new('RGBA', SIZE, BG_COLOR)
-        draw = ImageDraw.Draw(img)
-        
-        offset_y = -10 if i == 1 else 0  # 跳躍
-        draw_cat_base(draw, offset_y=offset_y, happy=True)
-        
-        # 畫一個球
-        ball_x = 100 if i == 0 else 105
-        draw.ellipse([ball_x, 90, ball_x+20, 110], fill=(50, 50, 255, 255))
-        
-        img.save(os.path.join(BASE_DIR, 'play', f'{i}.png'))
-
-
-def create_happy_frames():
-    """建立開心動畫"""
-    print("正在生成開心動畫...")
-    for i in range(2):
-        img = Image.new('RGBA', SIZE, BG_COLOR)
-        draw = ImageDraw.Draw(img)
-        
-        offset_y = -5 if i == 1 else 0  # 輕微跳動
-        draw_cat_base(draw, offset_y=offset_y, happy=True)
-        
-        # 愛心 (用圖形繪製)
-        if i == 1:
-            # 左圓
-            draw.ellipse([95, 30, 105, 40], fill=(255, 0, 0, 255))
-            # 右圓
-            draw.ellipse([105, 30, 115, 40], fill=(255, 0, 0, 255))
-            # 下方三角形
-            draw.polygon([(95, 35), (115, 35), (105, 45)], fill=(255, 0, 0, 255))
-        
-        img.save(os.path.join(BASE_DIR, 'happy', f'{i}.png'))
-
-
-def create_sad_frames():
-    """建立難過動畫"""
-    print("正在生成難過動畫...")
-    for i in range(2):
-        img = Image.new('RGBA', SIZE, BG_COLOR)
-        draw = ImageDraw.Draw(img)
-        
-        draw_cat_base(draw, sad=True)
-        
-        # 淚水
-        if i == 1:
-            draw.ellipse([50, 60, 53, 65], fill=(100, 100, 255, 255))
-            draw.ellipse([75, 60, 78, 65], fill=(100, 100, 255, 255))
-        
-        img.save(os.path.join(BASE_DIR, 'sad', f'{i}.png'))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                done = list(pool.map(render_job, pending))
+        for rel_path in done:
+            print(f"  ✓ {rel_path}")
+
+    entries = {rel_path: {'fingerprint': fp, 'output': output_stat(rel_path)}
+               for rel_path, fp in fingerprints.items()}
+    if entries != manifest:
+        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+
+    return len(pending)
 
 
 def main():
     """主程式"""
+    parser = argparse.ArgumentParser(description="生成桌面寵物素材")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="工作行程數（預設：幀數多時為 CPU 數，否則單一行程）")
+    parser.add_argument('--force', action='store_true', help="忽略建置清單，全部重建")
+    args = parser.parse_args()
+
     print("=" * 50)
     print("開始生成桌面寵物素材...")
     print("=" * 50)
     
     # 確保目錄存在
-    folders = ['idle', 'walk_left', 'walk_right', 'sleep', 'sit', 
-               'eat', 'play', 'happy', 'sad']
-    for folder in folders:
+    for folder, _, _, _ in FRAME_SPECS:
         os.makedirs(os.path.join(BASE_DIR, folder), exist_ok=True)
     
-    # 生成所有動畫
-    create_idle_frames()
-    create_walk_frames('right')
-    create_walk_frames('left')
-    create_sleep_frames()
-    create_sit_frame()
-    create_eat_frames()
-    create_play_frames()
-    create_happy_frames()
-    create_sad_frames()
+    # 生成所有動畫（增量 + 平行）
+    rebuilt = build(args.jobs, args.force)
+    
+    # 重新打包圖集，避免載入到過期的 atlas
+    if rebuilt or not os.path.exists(os.path.join(BASE_DIR, config.ATLAS_INDEX_FILE)):
+        pack_atlas(BASE_DIR)
     
     print("=" * 50)
     print("所有素材生成完成！")
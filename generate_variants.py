@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+批次生成換色寵物變體
+Batch palette-swap variant generator
+
+基本幀只繪製一次（索引遮罩），每個變體只是對全部幀做一次向量化的
+調色盤查表，再寫出到 assets/<變體名稱>/。變體定義在 data/pet_variants.json：
+
+    {"black_cat": {"cat": "#2b2b2b", "spot": "#f5f5f5"}, ...}
+
+生成後將 config.CURRENT_PET 設為變體名稱即可使用。
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+import config
+import generate_sprites
+from modules.asset_manifest import write_asset
+from pack_atlas import pack_atlas
+
+
+def render_variants(spec, names=None):
+    """
+    以查表產生各變體的 RGBA 幀（不寫檔）
+
+    Args:
+        spec: 變體定義
+        names: 只產生這些變體（預設全部）
+
+    Yields:
+        tuple: (變體名稱, {資料夾: [(h, w, 4) uint8, ...]})
+    """
+    index_frames = generate_sprites.render_index_frames()
+
+    # 所有幀疊成一個陣列，每個變體只需一次查表
+    layout = [(folder, len(frames)) for folder, frames in index_frames.items()]
+    stack = np.stack([frame for frames in index_frames.values() for frame in frames])
+
+    for name in names or spec:
+        rgba = generate_sprites.palette_lut(spec[name])[stack]
+        result, start = {}, 0
+        for folder, count in layout:
+            result[folder] = list(rgba[start:start + count])
+            start += count
+        yield name, result
+
+
+def _write_png(pixels, path):
+    """將一幀寫成 PNG（在執行緒池中執行）"""
+    image = Image.fromarray(pixels, 'RGBA')
+    write_asset(path, lambda tmp: image.save(tmp, format='PNG'))
+
+
+def save_variant(name, frames, pool):
+    """將一個變體的幀寫到 assets/<name>/（PNG 編碼交給執行緒池）"""
+    pet_dir = os.path.join(config.ASSETS_DIR, name)
+    futures = []
+    for folder, images in frames.items():
+        os.makedirs(os.path.join(pet_dir, folder), exist_ok=True)
+        for i, pixels in enumerate(images):
+            path = os.path.join(pet_dir, folder, f'{i}.png')
+            futures.append(pool.submit(_write_png, pixels, path))
+    for future in futures:
+        future.result()
+    return pet_dir
+
+
+def main():
+    """主程式"""
+    parser = argparse.ArgumentParser(description="批次生成換色寵物變體")
+    parser.add_argument('names', nargs='*', help="只生成指定的變體（預設全部）")
+    parser.add_argument('--spec', default=generate_sprites.VARIANTS_SPEC_PATH, help="變體定義檔")
+    parser.add_argument('--atlas', action='store_true', help="同時為每個變體打包圖集")
+    args = parser.parse_args()
+
+    spec = generate_sprites.load_variants(args.spec)
+    unknown = [name for name in args.names if name not in spec]
+    if unknown:
+        parser.error(f"未定義的變體: {', '.join(unknown)}")
+
+    with ThreadPoolExecutor() as pool:
+        for name, frames in render_variants(spec, args.names):
+            pet_dir = save_variant(name, frames, pool)
+            if args.atlas:
+                pack_atlas(pet_dir)
+            print(f"  ✓ {name} → {pet_dir}")
+
+    print(f"已生成 {len(args.names or spec)} 個變體")
+
+
+if __name__ == "__main__":
+    main()
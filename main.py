@@ -6,10 +6,10 @@
 2. 🚫 不再走出螢幕，會自動反向
 """
 
-import sys, os
-from PyQt5.QtWidgets import QApplication, QLabel, QMenu, QAction, QSystemTrayIcon
-from PyQt5.QtCore import Qt, QTimer, QPoint
-from PyQt5.QtGui import QPixmap, QIcon, QTransform
+import sys
+from PyQt5.QtWidgets import QApplication, QLabel, QMenu, QAction, QActionGroup, QSystemTrayIcon
+from PyQt5.QtCore import Qt, QPoint, QPropertyAnimation
+from PyQt5.QtGui import QIcon
 
 import config
 from behavior_manager import BehaviorManager
@@ -20,6 +20,13 @@ from modules.inventory_manager import InventoryManager
 from modules.interaction_manager import InteractionManager
 from modules.event_system import EventSystem
 from modules.save_manager import SaveManager
+from modules.animation_store import AnimationStore
+from modules.frame_store import FrameStore
+from modules.pet_loader import PetLoader, list_pets
+from modules.tick_scheduler import TickScheduler
+from modules.screen_geometry import ScreenGeometry
+from modules.visibility_policy import VisibilityPolicy
+from modules.stats_forecaster import StatsForecaster
 from modules.ui_panel import StatusPanel
 
 
@@ -36,7 +43,11 @@ class DesktopPet2(QLabel):
         self.current_state = None
         self.current_frame = 0
         self.frame_count = 0
-        self.animations = {}
+        self.current_animation = None
+        self.displayed_key = None  # 目前顯示的幀（內容雜湊），相同畫面不重設
+        self.current_pet = config.CURRENT_PET
+        self.pet_loader = None
+        self.switching_pet = None
 
         # system modules
         self.pet_stats = PetStats()
@@ -51,24 +62,18 @@ class DesktopPet2(QLabel):
             self.pet_stats, self.inventory, self.interaction_manager, self.event_system
         )
 
-        # Timers
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_animation)
+        # 主排程器（取代各自獨立的 QTimer）
+        self.scheduler = TickScheduler(parent=self)
+        self.animation_task = None
+        self.rendering = True  # 寵物看不見時為 False，暫停動畫與行走
 
-        self.behavior_timer = QTimer(self)
-        self.behavior_timer.timeout.connect(self.update_behavior)
+        # 行走：由 Qt 動畫框架在 C++ 端移動視窗，Python 只在每段終點被喚醒
+        self.walk_animation = QPropertyAnimation(self, b"pos", self)
+        self.walk_animation.finished.connect(self.on_walk_segment_finished)
 
-        self.movement_timer = QTimer(self)
-        self.movement_timer.timeout.connect(self.update_movement)
-
-        self.stats_timer = QTimer(self)
-        self.stats_timer.timeout.connect(self.update_stats)
-
-        self.event_timer = QTimer(self)
-        self.event_timer.timeout.connect(self.check_events)
-
-        self.autosave_timer = QTimer(self)
-        self.autosave_timer.timeout.connect(self.auto_save)
+        # 多螢幕可用範圍（快取，螢幕變更時才重算）
+        self.screen_geometry = ScreenGeometry(QApplication.instance(), parent=self)
+        self.screen_geometry.geometry_changed.connect(self.on_screen_geometry_changed)
 
         # Load save if exists
         if self.save_manager.save_exists():
@@ -79,13 +84,27 @@ class DesktopPet2(QLabel):
         self.create_tray_icon()
         self.connect_signals()
 
-        # start timers
-        self.animation_timer.start(config.ANIMATION_SPEED)
-        self.behavior_timer.start(config.BEHAVIOR_UPDATE_INTERVAL)
-        self.movement_timer.start(16)
-        self.stats_timer.start(1000)
-        self.event_timer.start(30000)
-        self.autosave_timer.start(300000)
+        # 註冊週期任務
+        self.animation_task = self.scheduler.call_every(
+            self.current_animation["speed"], self.update_animation, "animation")
+        self.sync_animation_task()
+        self.behavior_task = self.scheduler.call_every(
+            config.BEHAVIOR_UPDATE_INTERVAL, self.update_behavior, "behavior")
+        self.stats_task = self.scheduler.call_every(
+            config.STATS_UPDATE_INTERVAL, self.update_stats, "stats")
+        self.scheduler.call_every(30000, self.check_events, "events")
+        self.scheduler.call_every(300000, self.auto_save, "autosave")
+
+        # 門檻預測：只在狀態預計跌破門檻時喚醒一次（看不見時不必輪詢狀態）
+        self.stats_forecaster = StatsForecaster(self.pet_stats, self.scheduler, parent=self)
+        self.stats_forecaster.forecast_changed.connect(self.status_panel.show_forecast)
+        self.status_panel.show_forecast(self.stats_forecaster.deadlines)
+
+        # 可見性策略：看不見時暫停繪製工作，狀態只在預測的門檻時間更新
+        self.visibility = VisibilityPolicy(QApplication.instance(), self, self.status_panel, parent=self)
+        self.visibility.pet_visibility_changed.connect(self.on_pet_visibility_changed)
+        self.visibility.panel_visibility_changed.connect(self.on_panel_visibility_changed)
+        self.on_pet_visibility_changed(self.visibility.pet_visible)
 
         print("[Pet2.0] 初始化完成！")
 
@@ -97,8 +116,24 @@ class DesktopPet2(QLabel):
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setFixedSize(config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
+        # 幀畫在左上角，與從 (0, 0) 起算的點擊遮罩對齊（預設垂直置中，小於視窗的幀會被遮罩裁掉）
+        self.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         self.move(600, 600)
 
+        # 建立原生視窗，跨螢幕移動時切換對應裝置像素比的幀組
+        self.winId()
+        self.windowHandle().screenChanged.connect(self.on_screen_changed)
+        self.on_screen_changed(self.windowHandle().screen())
+
+    def on_screen_changed(self, screen):
+        """視窗移到另一個螢幕：改用符合其裝置像素比的預縮放幀"""
+        if screen is None:
+            return
+        if self.animation_store.set_device_pixel_ratio(screen.devicePixelRatio()):
+            frame = self.current_frame
+            self.set_animation_state(self.current_state)
+            self.current_frame = frame % max(self.frame_count, 1)
+
     # ─────────────────────────────────────────
     # Mouse events (拖曳 + 右鍵叫面板)
     # ─────────────────────────────────────────
@@ -107,6 +142,7 @@ class DesktopPet2(QLabel):
         if event.button() == Qt.LeftButton:
             self.dragging = True
             self.drag_pos = event.globalPos() - self.pos()
+            self.stop_walking()
 
         elif event.button() == Qt.RightButton:
             self.toggle_panel()
@@ -116,24 +152,47 @@ class DesktopPet2(QLabel):
             self.move(event.globalPos() - self.drag_pos)
 
     def mouseReleaseEvent(self, event):
-        self.dragging = False
+        was_dragging, self.dragging = self.dragging, False
+        if was_dragging and self.behavior_manager.is_walking():
+            self.plan_walk_segment()
 
     # ─────────────────────────────────────────
     # 系統托盤
     # ─────────────────────────────────────────
     def create_tray_icon(self):
-        icon = QIcon(self.animations["idle"]["frames"][0])
+        icon = QIcon(self.animation_store.get("idle")["frames"][0])
         self.tray = QSystemTrayIcon(icon, self)
 
         menu = QMenu()
+        menu.addAction("👁 隱藏/顯示寵物", self.toggle_pet_visibility)
         menu.addAction("📊 控制面板", self.toggle_panel)
         menu.addAction("💾 存檔", self.manual_save)
+
+        pet_menu = menu.addMenu("🐾 切換寵物")
+        self.pet_actions = QActionGroup(self)
+        for pet in list_pets():
+            action = QAction(pet, self.pet_actions, checkable=True)
+            action.setChecked(pet == self.current_pet)
+            action.triggered.connect(lambda checked, name=pet: self.switch_pet(name))
+            pet_menu.addAction(action)
+
         menu.addSeparator()
         menu.addAction("❌ 退出", self.quit_app)
 
         self.tray.setContextMenu(menu)
+        self.tray.activated.connect(self.on_tray_activated)
         self.tray.show()
 
+    def on_tray_activated(self, reason):
+        if reason == QSystemTrayIcon.Trigger:
+            self.toggle_pet_visibility()
+
+    def toggle_pet_visibility(self):
+        if self.isVisible():
+            self.hide()
+        else:
+            self.show()
+
     def toggle_panel(self):
         if self.status_panel.isVisible():
             self.status_panel.hide()
@@ -145,53 +204,118 @@ class DesktopPet2(QLabel):
     # ─────────────────────────────────────────
     def load_animations(self):
         print("[Pet2.0] 🔍 載入動畫...")
-
-        for state, info in config.ANIMATION_STATES.items():
-            if state not in config.MIRROR_ANIMATIONS:
-                self._load_frames(state, info["folder"], info["frames"], info["speed"])
-
-        # 鏡像生成
-        for new_state, src_state in config.MIRROR_ANIMATIONS.items():
-            print(f"  ⟳ 自動生成鏡像動畫 → {new_state}（來源: {src_state}）")
-            frames = self.animations[src_state]["frames"]
-            mirrored = [pix.transformed(QTransform().scale(-1, 1)) for pix in frames]
-            self.animations[new_state] = {"frames": mirrored, "speed": self.animations[src_state]["speed"]}
-
-        # idle fallback
-        if "idle" in self.animations:
-            idle_frames = self.animations["idle"]["frames"]
-            idle_speed = self.animations["idle"]["speed"]
-            for key, anim in list(self.animations.items()):
-                if len(anim["frames"]) == 0:
-                    print(f"  ⚠ {key} 沒圖片 → 使用 idle 替代")
-                    self.animations[key] = {"frames": idle_frames, "speed": idle_speed}
-
+        self.frame_store = FrameStore()
+        self.animation_store = AnimationStore(
+            config.PET_ASSETS_DIR, config.FRAME_CACHE_FILE, self.frame_store,
+            device_pixel_ratio=QApplication.primaryScreen().devicePixelRatio())
         self.set_animation_state("idle")
 
-    def _load_frames(self, state, folder, count, speed):
-        path = os.path.join(config.PET_ASSETS_DIR, folder)
-        frames = []
+    def switch_pet(self, pet):
+        """
+        執行中切換寵物：工作執行緒解碼，GUI 執行緒分批建立 QPixmap，完成後才一次替換
 
-        for i in range(count):
-            fp = os.path.join(path, f"{i}.png")
-            if os.path.exists(fp):
-                frames.append(QPixmap(fp))
+        Args:
+            pet: 寵物名稱
+        """
+        if pet == self.current_pet or self.switching_pet is not None:
+            self._sync_pet_actions()
+            return
 
-        self.animations[state] = {"frames": frames, "speed": speed}
-        print(f"  ✓ 載入動畫: {state} ({len(frames)} 幀)")
+        print(f"[Pet2.0] 🐾 背景載入寵物: {pet}")
+        self.switching_pet = pet
+        self.pet_loader = PetLoader(pet, self.frame_store,
+                                    self.animation_store.device_pixel_ratio, parent=self)
+        self.pet_loader.loaded.connect(self.on_pet_loaded)
+        self.pet_loader.failed.connect(self.on_pet_load_failed)
+        self.pet_loader.finished.connect(self.on_pet_loader_finished)
+        self.pet_loader.start()
+
+    def on_pet_loader_finished(self):
+        self.pet_loader.deleteLater()
+        self.pet_loader = None
+
+    def on_pet_loaded(self, pet, store):
+        """新寵物的 QImage 已就緒：分批轉換常駐狀態與目前狀態"""
+        store.set_device_pixel_ratio(self.animation_store.device_pixel_ratio)
+        states = ["idle", self.current_state] + sorted(store.pinned)
+        self._convert_pet_batch(pet, store, store.preload(states))
+
+    def _convert_pet_batch(self, pet, store, steps):
+        """每次事件迴圈只轉換少量幀，讓動畫與拖曳持續回應"""
+        for _ in range(config.PET_SWITCH_BATCH_SIZE):
+            if next(steps, StopIteration) is StopIteration:
+                self._swap_pet(pet, store)
+                return
+        self.scheduler.call_later(0, lambda: self._convert_pet_batch(pet, store, steps),
+                                  "pet_switch")
+
+    def _swap_pet(self, pet, store):
+        """一次替換動畫儲存區，並釋放舊寵物的 QPixmap"""
+        icon = QIcon(store.get("idle")["frames"][0])  # PetLoader 已確認 idle 有幀
+        old_store, self.animation_store = self.animation_store, store
+        self.current_pet = pet
+        self.switching_pet = None
+
+        frame = self.current_frame
+        self.set_animation_state(self.current_state)
+        if self.frame_count:
+            self.current_frame = frame % self.frame_count
+        old_store.release_all()
+
+        self.tray.setIcon(icon)
+        self._sync_pet_actions()
+        print(f"[Pet2.0] 🐾 已切換寵物: {pet}")
+
+    def on_pet_load_failed(self, pet, message):
+        self.switching_pet = None
+        self._sync_pet_actions()
+        self.tray.showMessage("切換寵物失敗", f"{pet}: {message}")
+
+    def _sync_pet_actions(self):
+        """讓選單勾選狀態與目前寵物一致"""
+        for action in self.pet_actions.actions():
+            action.setChecked(action.text() == self.current_pet)
 
     def set_animation_state(self, state):
-        if state in self.animations:
+        anim = self.animation_store.get(state)
+        if anim is not None:
             self.current_state = state
+            self.current_animation = anim
             self.current_frame = 0
-            self.frame_count = len(self.animations[state]["frames"])
-            self.animation_timer.setInterval(self.animations[state]["speed"])
+            self.frame_count = len(anim["frames"])
+            self.sync_animation_task()
+
+    def sync_animation_task(self):
+        """靜態狀態（單幀或每幀都相同）顯示一次後停止動畫任務，其餘依速度重新計時"""
+        if self.animation_task is None:
+            return
+        if not self.rendering:
+            self.scheduler.pause(self.animation_task)
+        elif self.current_animation["static"]:
+            self.update_animation()
+            self.scheduler.pause(self.animation_task)
+        else:
+            self.scheduler.set_interval(self.animation_task, self.current_animation["speed"])
+            self.scheduler.resume(self.animation_task)
 
     def update_animation(self):
         if self.frame_count == 0:
             return
-        frames = self.animations[self.current_state]["frames"]
-        self.setPixmap(frames[self.current_frame])
+        # 只有畫面內容真的改變時才重設（每次 setPixmap 都會讓半透明視窗重繪）
+        key = self.current_animation["keys"][self.current_frame]
+        if key != self.displayed_key:
+            self.displayed_key = key
+            self.setPixmap(self.current_animation["frames"][self.current_frame])
+
+            # 點擊穿透：套用該幀預先算好的區域
+            if config.CLICK_THROUGH_TRANSPARENT:
+                self.setMask(self.current_animation["regions"][self.current_frame])
+
+        # GIF/APNG 匯入的動畫每幀時間不同：顯示後依該幀時間排定下一幀
+        durations = self.current_animation.get("durations")
+        if durations:
+            self.scheduler.set_interval(self.animation_task, durations[self.current_frame])
+
         self.current_frame = (self.current_frame + 1) % self.frame_count
 
     # ─────────────────────────────────────────
@@ -199,34 +323,101 @@ class DesktopPet2(QLabel):
     # ─────────────────────────────────────────
     def update_behavior(self):
         self.set_animation_state(self.behavior_manager.update_behavior())
-
-    def update_movement(self):
-        if not self.behavior_manager.is_walking() or self.dragging:
+        if not self.behavior_manager.is_walking():
+            self.stop_walking()
+        elif not self.dragging:  # 拖曳中不移動視窗，放開時由 mouseReleaseEvent 重新規劃
+            self.start_walking()
+
+    def start_walking(self):
+        """開始行走（方向可能已改變，因此每次都重新規劃）"""
+        self.plan_walk_segment()
+
+    def stop_walking(self):
+        """停止行走動畫，閒置時不再喚醒"""
+        self.walk_animation.stop()
+
+    def plan_walk_segment(self):
+        """規劃一段直走到螢幕邊界的移動，預先限制在邊界內"""
+        min_x, max_x = self.screen_geometry.x_range(self.width())
+        if max_x <= min_x:
             return
 
+        x, y = self.screen_geometry.clamp(self.x(), self.y(), self.width(), self.height())
+        if self.behavior_manager.get_walk_direction() == "right":
+            if x >= max_x:
+                self.turn_around("left")
+        elif x <= min_x:
+            self.turn_around("right")
+
+        target_x = max_x if self.behavior_manager.get_walk_direction() == "right" else min_x
+        distance = abs(target_x - x)
+
+        self.walk_animation.stop()
+        self.walk_animation.setStartValue(QPoint(x, y))
+        self.walk_animation.setEndValue(QPoint(target_x, y))
+        self.walk_animation.setDuration(int(distance / config.MOVE_SPEED * 1000))
+        self.walk_animation.start()
+
+    def on_screen_geometry_changed(self):
+        """螢幕配置改變：行走中的路段依新邊界重新規劃"""
+        if self.behavior_manager.is_walking() and not self.dragging:
+            self.plan_walk_segment()
+
+    def on_walk_segment_finished(self):
+        """走到邊界：反向並規劃下一段"""
+        if not self.behavior_manager.is_walking():
+            return
         direction = self.behavior_manager.get_walk_direction()
-        new_x = self.x() + (config.MOVE_SPEED if direction == "right" else -config.MOVE_SPEED)
-        screen_width = QApplication.primaryScreen().size().width()
-
-        # ⭐ 防止走出螢幕邊界
-        if new_x < 0:
-            new_x = 0
-            self.behavior_manager.force_flip_direction("right")
+        self.turn_around("left" if direction == "right" else "right")
+        self.plan_walk_segment()
 
-        elif new_x + self.width() > screen_width:
-            new_x = screen_width - self.width()
-            self.behavior_manager.force_flip_direction("left")
-
-        self.move(new_x, self.y())
+    def turn_around(self, direction):
+        """碰到邊界時轉向，並同步切換行走動畫"""
+        self.behavior_manager.force_flip_direction(direction)
+        self.set_animation_state(self.behavior_manager.get_animation_state())
 
     # ─────────────────────────────────────────
     # Stats / Events
     # ─────────────────────────────────────────
     def update_stats(self):
         self.pet_stats.update()
-        self.status_panel.refresh_stats()
+        if self.status_panel.isVisible():
+            self.status_panel.refresh_stats()
+
+    # ─────────────────────────────────────────
+    # Visibility
+    # ─────────────────────────────────────────
+    def on_pet_visibility_changed(self, visible):
+        """寵物看不見時暫停動畫、行為與行走；恢復時依經過時間一次補上"""
+        self.rendering = visible
+        if visible:
+            self.update_stats()
+            self.scheduler.resume(self.behavior_task)
+            self.sync_animation_task()
+            if self.behavior_manager.is_walking() and not self.dragging:
+                self.plan_walk_segment()
+        else:
+            self.scheduler.pause(self.behavior_task)
+            self.sync_animation_task()
+            self.stop_walking()
+        self.sync_stats_task()
+
+    def on_panel_visibility_changed(self, visible):
+        """面板打開時立即刷新（關閉期間不刷新）"""
+        if visible:
+            self.update_stats()
+        self.sync_stats_task()
+
+    def sync_stats_task(self):
+        """有東西看得見時每秒更新；完全看不見時暫停（門檻由 StatsForecaster 喚醒，PetStats 依經過時間補算）"""
+        if self.visibility.anything_visible:
+            self.scheduler.resume(self.stats_task)
+        else:
+            self.scheduler.pause(self.stats_task)
 
     def check_events(self):
+        # 看不見時狀態任務暫停，事件與成就判斷前先依經過時間補算（O(1)）
+        self.pet_stats.update()
         self.event_system.try_trigger_event()
         self.event_system.check_achievements()
 
@@ -249,11 +440,18 @@ class DesktopPet2(QLabel):
     def quit_app(self):
         print("[Pet2.0] 正在退出並自動存檔...")
         self.manual_save()
+        if self.pet_loader is not None:
+            self.pet_loader.wait()
+        self.scheduler.print_stats()
+        self.frame_store.print_stats()
         self.tray.hide()
         QApplication.quit()
 
 
 def main():
+    # HiDPI：讓 Qt 回報真實的裝置像素比，幀組依此預先縮放
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     pet = DesktopPet2()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+單檔動畫匯入
+Single-File Animation Import
+
+除了 <state>/0.png、1.png… 的逐幀資料夾，每個狀態也可以只提供一個檔案：
+
+    <state>.gif            動畫 GIF（每幀時間取自檔案）
+    <state>.png / .apng    APNG（每幀時間取自檔案；非動畫 PNG 視為單幀）
+    <state>.sheet.png      精靈表，可搭配 <state>.sheet.json：
+                           {"frame_width": 128, "frame_height": 128, "durations": [...]}
+                           未提供時視為正方形幀水平（或垂直）排列
+
+檔案以 Pillow 解碼一次，切出來的幀由 FrameCache 快取，之後啟動不再解碼。
+"""
+
+import json
+import os
+
+from PIL import Image, ImageSequence
+
+MIN_FRAME_DURATION = 20  # 毫秒；0 或過小的 GIF 延遲以此為下限
+
+
+def find_animation_file(pet_dir, folder):
+    """
+    尋找狀態的單檔動畫
+
+    Returns:
+        str: 檔案路徑；沒有時回傳 None
+    """
+    for suffix in ('.gif', '.apng', '.png', '.sheet.png'):
+        path = os.path.join(pet_dir, folder + suffix)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load_animation_file(path, speed):
+    """
+    解碼單檔動畫
+
+    Args:
+        path: 檔案路徑
+        speed: 檔案未提供時間時使用的每幀毫秒數
+
+    Returns:
+        tuple: ([RGBA Image, ...], [每幀毫秒數, ...])
+    """
+    if path.endswith('.sheet.png'):
+        return _load_sheet(path, speed)
+
+    frames, durations = [], []
+    with Image.open(path) as img:
+        for frame in ImageSequence.Iterator(img):
+            frames.append(frame.convert('RGBA'))
+            duration = frame.info.get('duration') or speed
+            durations.append(max(int(duration), MIN_FRAME_DURATION))
+    return frames, durations
+
+
+def _load_sheet(path, speed):
+    """切割精靈表"""
+    meta = {}
+    meta_path = path[:-len('.png')] + '.json'
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    with Image.open(path) as img:
+        sheet = img.convert('RGBA')
+
+    side = min(sheet.size)
+    fw = meta.get('frame_width', side)
+    fh = meta.get('frame_height', side)
+    columns, rows = sheet.width // fw, sheet.height // fh
+
+    frames = [sheet.crop((c * fw, r * fh, (c + 1) * fw, (r + 1) * fh))
+              for r in range(rows) for c in range(columns)]
+    frames = frames[:meta.get('frames', len(frames))]
+
+    # durations 比幀數少時以速度補齊，多的部分捨去（每幀都必須有時間）
+    speed = meta.get('speed', speed)
+    durations = list(meta.get('durations') or [])[:len(frames)]
+    durations += [speed] * (len(frames) - len(durations))
+    return frames, [max(int(d), MIN_FRAME_DURATION) for d in durations]
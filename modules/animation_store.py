@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+動畫儲存區
+Animation Store
+
+啟動時只準備 idle，其他狀態在第一次切換時才轉成 QPixmap，
+已載入的狀態以 LRU 管理，超過記憶體預算時釋放最久未使用者。
+HiDPI 螢幕使用預先依裝置像素比縮放好的幀組，繪製時不必再縮放。
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+import config
+from modules.animation_import import load_animation_file
+from modules.asset_manifest import AssetManifest, write_asset
+from modules.frame_cache import FrameCache
+from modules.frame_store import FrameStore
+
+
+class AnimationStore:
+    """延遲載入、具記憶體預算的動畫儲存區"""
+
+    def __init__(self, pet_dir, cache_path, frame_store=None,
+                 budget_bytes=config.ANIMATION_MEMORY_BUDGET, device_pixel_ratio=1.0):
+        """
+        初始化動畫儲存區
+
+        Args:
+            pet_dir: 寵物素材目錄
+            cache_path: 已解碼幀快取路徑
+            frame_store: 共用的 FrameStore（可跨寵物去重），預設建立新的
+            budget_bytes: 常駐 QPixmap 的記憶體預算（位元組，以去重後計算）
+            device_pixel_ratio: 初始的裝置像素比
+        """
+        self.pet_dir = pet_dir
+        self.cache_path = cache_path
+        self.budget_bytes = budget_bytes
+        self.frame_store = frame_store or FrameStore()
+        self._buffers = []  # 記憶體生成幀的 NumPy 緩衝區（QImage 直接引用）
+        self.manifest = AssetManifest(pet_dir)
+
+        # idle 與鏡像來源常駐，不會被淘汰
+        self.pinned = {'idle'} | set(self.manifest.mirrors.values())
+
+        # 已解碼的 QImage 來源 {state: {"frames": [QImage], "speed": int}}
+        # 各裝置像素比的快取都保留著，因為 QImage 直接引用其映射記憶體
+        self.frame_cache = FrameCache(self.manifest, cache_path)
+        self._caches = {1.0: self.frame_cache}
+        self._base_sources = self._open_sources(self.frame_cache, self._decode_animations)
+        self._sources = self._base_sources
+        self.device_pixel_ratio = 1.0
+
+        # 已轉成 QPixmap 的狀態 {state: 同 get() 的回傳格式}
+        self._resident = OrderedDict()
+
+        self.set_device_pixel_ratio(device_pixel_ratio)
+
+    @staticmethod
+    def _open_sources(cache, build):
+        """
+        取得所有狀態的 QImage 來源
+
+        暖啟動直接使用記憶體映射的快取；冷啟動以 build() 產生一次並寫入快取，
+        之後改用映射，讓產生出來的影像可以立即釋放。
+        """
+        sources = cache.load()
+        if sources is not None:
+            return sources
+
+        sources = build()
+        if cache.save(sources):
+            return cache.load() or sources
+        return sources
+
+    # ─────────────────────────────────────────
+    # HiDPI
+    # ─────────────────────────────────────────
+    def set_device_pixel_ratio(self, dpr):
+        """
+        切換到符合裝置像素比的幀組（視窗移到另一個螢幕時呼叫）
+
+        Args:
+            dpr: 裝置像素比
+
+        Returns:
+            bool: 是否切換了幀組
+        """
+        dpr = float(dpr)
+        if dpr == self.device_pixel_ratio:
+            return False
+
+        self.release_all()
+        self.device_pixel_ratio = dpr
+        if dpr == 1.0:
+            self._sources = self._base_sources
+        else:
+            cache = self._caches.get(dpr)
+            if cache is None:
+                base, ext = os.path.splitext(self.cache_path)
+                cache = self._caches[dpr] = FrameCache(self.manifest, f"{base}@{dpr:g}x{ext}", dpr)
+            self._sources = self._open_sources(cache, lambda: self._scale_sources(dpr))
+
+        print(f"[AnimationStore] 使用 {dpr:g}x 幀組")
+        return True
+
+    def _scale_sources(self, dpr):
+        """將基本幀組平滑縮放到指定裝置像素比（共用的幀只縮放一次）"""
+        print(f"[AnimationStore] 產生 {dpr:g}x 預縮放幀...")
+        scaled = {}
+        done = {}
+        for state, anim in self._base_sources.items():
+            frames = []
+            for img in anim["frames"]:
+                if id(img) not in done:
+                    frame = img.scaled(round(img.width() * dpr), round(img.height() * dpr),
+                                       Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                    frame.setDevicePixelRatio(dpr)
+                    done[id(img)] = frame
+                frames.append(done[id(img)])
+            scaled[state] = dict(anim, frames=frames)
+        return scaled
+
+    # ─────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────
+    def __contains__(self, state):
+        return state in self._sources
+
+    def has_frames(self, state):
+        """
+        狀態是否有任何幀（只檢查 QImage 來源，可在工作執行緒呼叫）
+
+        Args:
+            state: 動畫狀態名稱
+
+        Returns:
+            bool: 有幀時為 True
+        """
+        return bool(self._sources.get(state, {}).get("frames"))
+
+    def get(self, state):
+        """
+        取得動畫（必要時才轉成 QPixmap）
+
+        Args:
+            state: 動畫狀態名稱
+
+        Returns:
+            dict: {"frames": [QPixmap], "speed": int, "keys": [str], "regions": [QRegion],
+                   "static": bool}（單檔動畫另有 "durations"）；
+                  狀態不存在時回傳 None
+        """
+        anim = self._resident.get(state)
+        if anim is not None:
+            self._resident.move_to_end(state)
+            return anim
+
+        if state not in self._sources:
+            return None
+
+        for _ in self._convert(state):
+            pass
+        return self._resident[state]
+
+    def preload(self, states):
+        """
+        逐幀將狀態轉成 QPixmap 的產生器（必須在 GUI 執行緒執行）
+
+        每次 next() 只轉換一幀，呼叫端可以分散到多次事件迴圈執行。
+
+        Args:
+            states: 要預先轉換的狀態
+        """
+        for state in states:
+            if state in self._sources and state not in self._resident:
+                yield from self._convert(state)
+
+    def _convert(self, state):
+        """轉換單一狀態（每轉一幀 yield 一次），完成後放入常駐區"""
+        source = self._sources[state]
+
+        # 相同內容的幀共用同一個 QPixmap
+        keys, frames = [], []
+        for img in source["frames"]:
+            key, pixmap = self.frame_store.intern(img)
+            keys.append(key)
+            frames.append(pixmap)
+            yield
+        anim = {"frames": frames, "speed": source["speed"], "keys": keys,
+                "regions": [self.frame_store.region(key) for key in keys],
+                "static": len(set(keys)) <= 1}  # 單幀或每幀都相同：不需要動畫任務
+        if "durations" in source:
+            anim["durations"] = source["durations"]
+
+        self._resident[state] = anim
+        self._evict()
+
+    def _evict(self):
+        """超過預算時依 LRU 順序釋放未固定的狀態（最新載入者保留）"""
+        for state in list(self._resident)[:-1]:
+            if self.frame_store.resident_bytes <= self.budget_bytes:
+                break
+            if state in self.pinned:
+                continue
+            anim = self._resident.pop(state)
+            for key in anim["keys"]:
+                self.frame_store.release(key)
+            print(f"[AnimationStore] 釋放動畫: {state}")
+
+    def release_all(self):
+        """釋放所有常駐狀態（切換寵物或結束時）"""
+        for anim in self._resident.values():
+            for key in anim["keys"]:
+                self.frame_store.release(key)
+        self._resident.clear()
+
+    # ─────────────────────────────────────────
+    # 解碼
+    # ─────────────────────────────────────────
+    def _decode_animations(self):
+        """
+        解碼所有動畫（含鏡像與 idle 替代）
+
+        Returns:
+            dict: {state: {"frames": [QImage], "speed": int}}
+        """
+        images = {}
+        manifest = self.manifest
+        if manifest.atlas:
+            self._load_atlas(images, os.path.join(self.pet_dir, manifest.atlas))
+
+        # 圖集沒有涵蓋的狀態（圖集過期或之後才加入的素材）讀取資料夾中的逐幀 PNG
+        for state, info in manifest.states.items():
+            if state not in manifest.mirrors and "file" not in info and state not in images:
+                self._load_frames(images, state, info["folder"], info["frames"], info["speed"])
+
+        self._import_animation_files(images)
+
+        if config.GENERATE_MISSING_ASSETS:
+            self._generate_missing(images)
+
+        # 仍然沒有幀的狀態（例如動畫檔無法解碼）交給替代規則處理
+        for state, info in manifest.states.items():
+            if state not in manifest.mirrors:
+                images.setdefault(state, {"frames": [], "speed": info["speed"]})
+
+        # 鏡像生成
+        for new_state, src_state in manifest.mirrors.items():
+            if not images.get(src_state, {}).get("frames"):
+                # 手寫清單可能沒有鏡像來源：留空交給替代規則
+                print(f"  ⚠ 鏡像來源 {src_state} 沒圖片 → {new_state} 改用替代規則")
+                speed = config.ANIMATION_STATES.get(new_state, {}).get("speed", config.ANIMATION_SPEED)
+                images[new_state] = {"frames": [], "speed": speed}
+                continue
+            print(f"  ⟳ 自動生成鏡像動畫 → {new_state}（來源: {src_state}）")
+            frames = images[src_state]["frames"]
+            mirrored = [img.mirrored(True, False) for img in frames]
+            images[new_state] = dict(images[src_state], frames=mirrored)
+
+        # 替代規則（預設為 idle）
+        def has_frames(state):
+            return bool(images.get(state, {}).get("frames"))
+
+        for key in list(images):
+            if not has_frames(key):
+                target = manifest.fallback_for(key, has_frames)
+                if target is not None:
+                    print(f"  ⚠ {key} 沒圖片 → 使用 {target} 替代")
+                    images[key] = images[target]
+
+        return images
+
+    def _import_animation_files(self, images):
+        """
+        沒有逐幀 PNG 的狀態改用單檔動畫（GIF / APNG / 精靈表）
+
+        每個檔案只在冷啟動時以 Pillow 解碼一次，切出的幀與每幀時間隨後寫入 FrameCache。
+        """
+        for state, info in self.manifest.states.items():
+            if "file" not in info or images.get(state, {}).get("frames"):
+                continue
+            path = os.path.join(self.pet_dir, info["file"])
+
+            try:
+                frames, durations = load_animation_file(path, info["speed"])
+            except Exception as e:
+                print(f"  ⚠ 無法解碼 {os.path.basename(path)}: {e}")
+                continue
+
+            images[state] = {"frames": [self._wrap_rgba(f) for f in frames],
+                             "speed": info["speed"], "durations": durations}
+            print(f"  ✓ 匯入動畫檔: {state} ← {os.path.basename(path)} ({len(frames)} 幀)")
+
+    def _wrap_rgba(self, image):
+        """以 QImage 包住 Pillow RGBA 影像的像素（位元組需保持存活）"""
+        data = image.tobytes()
+        self._buffers.append(data)
+        return QImage(data, image.width, image.height, image.width * 4, QImage.Format_RGBA8888)
+
+    def _generate_missing(self, images):
+        """
+        缺少圖片的狀態直接在記憶體中生成（不經過 PNG 寫檔再讀回）
+
+        只適用於 generate_sprites 畫得出來的寵物（預設貓與換色變體）。
+        """
+        missing = [state for state in self.manifest.states
+                   if state not in self.manifest.mirrors
+                   and not images.get(state, {}).get("frames")]
+        if not missing:
+            return
+
+        import generate_sprites  # 需要 numpy，只在真的缺素材時才載入
+
+        pet = os.path.basename(os.path.normpath(self.pet_dir))
+        palette = generate_sprites.pet_palette(pet)
+        if palette is None:
+            return
+
+        generated = generate_sprites.render_frames(palette)
+        persist = {}
+        for state in missing:
+            info = self.manifest.states[state]
+            buffers = generated.get(info["folder"], [])
+            if not buffers:
+                continue
+
+            # QImage 直接包住 NumPy 緩衝區（零複製），陣列需保持存活
+            self._buffers.extend(buffers)
+            frames = [QImage(buf.data, buf.shape[1], buf.shape[0], buf.strides[0],
+                             QImage.Format_RGBA8888) for buf in buffers]
+            images[state] = {"frames": frames, "speed": info["speed"]}
+            persist[info["folder"]] = buffers
+            print(f"  ✦ 記憶體生成動畫: {state} ({len(frames)} 幀)")
+
+        if persist and config.PERSIST_GENERATED_ASSETS:
+            threading.Thread(target=self._persist_frames, args=(persist,), daemon=True).start()
+
+    def _persist_frames(self, frames):
+        """
+        背景執行緒：將生成的幀寫成 PNG
+
+        已存在的檔案一律保留，不覆寫美術放進資料夾的圖片。
+        """
+        from PIL import Image
+
+        try:
+            for folder, buffers in frames.items():
+                os.makedirs(os.path.join(self.pet_dir, folder), exist_ok=True)
+                for i, buf in enumerate(buffers):
+                    path = os.path.join(self.pet_dir, folder, f"{i}.png")
+                    if os.path.exists(path):
+                        continue
+                    image = Image.fromarray(buf, 'RGBA')
+                    write_asset(path, lambda tmp: image.save(tmp, format='PNG'))
+            print(f"[AnimationStore] 已於背景儲存生成的素材: {self.pet_dir}")
+        except Exception as e:
+            print(f"[AnimationStore] 儲存生成素材失敗: {e}")
+
+    def _load_frames(self, images, state, folder, count, speed):
+        """依清單記錄的幀數直接讀取（不逐一探測檔案是否存在）"""
+        path = os.path.join(self.pet_dir, folder)
+        frames = [QImage(os.path.join(path, f"{i}.png")) for i in range(count)]
+        frames = [img for img in frames if not img.isNull()]
+
+        images[state] = {"frames": frames, "speed": speed}
+        print(f"  ✓ 載入動畫: {state} ({len(frames)} 幀)")
+
+    def _load_atlas(self, images, index_path):
+        """從單一圖集載入所有動畫：只解碼一次，再以 QImage.copy 切出各幀"""
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+        sheet = QImage(os.path.join(self.pet_dir, index["image"]))
+        print(f"  ▦ 使用圖集: {index['image']} ({sheet.width()}x{sheet.height()})")
+
+        for state, info in index["states"].items():
+            frames = [sheet.copy(*rect) for rect in info["rects"]]
+            images[state] = {"frames": frames, "speed": info["speed"]}
+            print(f"  ✓ 載入動畫: {state} ({len(frames)} 幀)")
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+寵物素材清單
+Per-Pet Asset Manifest
+
+assets/<pet>/manifest.json 描述該寵物有哪些狀態、每個狀態幾幀、速度、鏡像與替代規則，
+不同寵物可以有不同的幀數，不必修改 config.py。
+
+清單不存在時掃描一次目錄自動產生，並記下各目錄的 mtime 與動畫設定的雜湊；之後啟動只讀這個檔案，
+再 stat 記錄過的目錄確認沒有新增或刪除檔案、比對設定沒有改變，不必再列目錄探測每個狀態有幾幀。
+手寫的清單（沒有 "generated" 欄位）視為權威，不會被重新掃描覆蓋。
+
+格式：
+    {
+        "states":    {"idle": {"folder": "idle", "frames": 2, "speed": 200},
+                      "sleep": {"file": "sleep.gif", "speed": 300}, ...},
+        "mirrors":   {"walk_left": "walk_right"},
+        "fallbacks": {"sleep": "idle", ...},
+        "atlas":     "atlas.json" 或 null,
+        "generated": {"version": 2, "config": "<設定雜湊>",
+                      "mtimes": {".": 1700000000000000000, "idle": ...}}
+    }
+
+注意：目錄 mtime 只在新增、刪除或以 os.replace 取代檔案時改變，
+本專案的產生工具都經由 write_asset 以「寫暫存檔再替換」的方式輸出。
+原地覆寫的檔案由 signature() 涵蓋：每次啟動都會 stat 清單列出的每個來源檔案（含每一幀）
+取得 mtime 與大小；路徑由清單直接組出，不需要列目錄或探測不存在的檔案。
+"""
+
+import hashlib
+import json
+import os
+
+import config
+from modules.animation_import import find_animation_file
+
+
+def write_asset(path, write):
+    """
+    以「寫暫存檔再替換」的方式輸出素材檔
+
+    os.replace 會改變所在目錄的 mtime，素材清單與幀快取因此能發現變動；
+    中途結束也不會留下寫到一半的檔案。
+
+    Args:
+        path: 目標路徑
+        write: 接收暫存檔路徑並寫入內容的函式
+    """
+    tmp_path = path + '.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def config_hash():
+    """
+    動畫設定的雜湊（config.ANIMATION_STATES 等改變時，自動產生的清單與幀快取都要失效）
+
+    Returns:
+        str: 雜湊字串
+    """
+    payload = json.dumps([config.ANIMATION_STATES, config.MIRROR_ANIMATIONS,
+                          config.OPTIONAL_ANIMATIONS], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class AssetManifest:
+    """單一寵物的素材清單"""
+
+    VERSION = 2
+
+    def __init__(self, pet_dir):
+        """
+        載入（必要時產生）素材清單
+
+        Args:
+            pet_dir: 寵物素材目錄
+        """
+        self.pet_dir = pet_dir
+        self.path = os.path.join(pet_dir, config.ASSET_MANIFEST_FILE)
+
+        self.states = {}     # {state: {"folder": str, "frames": int, "speed": int, "file": str}}
+        self.mirrors = {}    # {鏡像狀態: 來源狀態}
+        self.fallbacks = {}  # {狀態: 沒有幀時改用的狀態}
+        self.atlas = None    # 圖集索引檔名
+        self.mtimes = {}     # {相對目錄: mtime_ns}
+
+        self.load()
+
+    # ─────────────────────────────────────────
+    # 載入
+    # ─────────────────────────────────────────
+    def load(self):
+        """讀取清單；不存在、損毀或目錄已變動時重新掃描"""
+        data = self._read()
+        if data is None or not self._is_fresh(data):
+            data = self.scan()
+            self._write(data)
+        self._apply(data)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[AssetManifest] 讀取清單失敗，將重新掃描: {e}")
+            return None
+
+    def _is_fresh(self, data):
+        """自動產生的清單：比對記錄的目錄 mtime"""
+        generated = data.get('generated')
+        if generated is None:
+            return True
+        if generated.get('version') != self.VERSION:
+            return False
+        if generated.get('config') != config_hash():
+            return False
+        return generated.get('mtimes') == self._stat_dirs(generated.get('mtimes', {}))
+
+    def _apply(self, data):
+        """套用清單內容，未填的欄位使用 config 的預設值"""
+        self.states = {}
+        for state, info in data.get('states', {}).items():
+            defaults = config.ANIMATION_STATES.get(state, {})
+            entry = {
+                'folder': info.get('folder', defaults.get('folder', state)),
+                'frames': info.get('frames', 0),
+                'speed': info.get('speed', defaults.get('speed', config.ANIMATION_SPEED)),
+            }
+            if info.get('file'):
+                entry['file'] = info['file']
+            self.states[state] = entry
+
+        self.mirrors = dict(data.get('mirrors', config.MIRROR_ANIMATIONS))
+        self.fallbacks = dict(data.get('fallbacks', {}))
+        self.atlas = data.get('atlas')
+
+        generated = data.get('generated')
+        if generated is not None:
+            self.mtimes = generated['mtimes']
+        else:
+            folders = {'.'} | {info['folder'] for info in self.states.values()}
+            self.mtimes = self._stat_dirs(folders)
+
+    # ─────────────────────────────────────────
+    # 掃描
+    # ─────────────────────────────────────────
+    def scan(self):
+        """
+        掃描寵物目錄產生清單
+
+        Returns:
+            dict: 清單內容（mtime 於寫入後才填入）
+        """
+        print(f"[AssetManifest] 掃描素材目錄: {self.pet_dir}")
+        entries = set(os.listdir(self.pet_dir)) if os.path.isdir(self.pet_dir) else set()
+
+        states = {}
+        for state, info in config.ANIMATION_STATES.items():
+            if state in config.MIRROR_ANIMATIONS:
+                continue
+            folder = info['folder']
+            entry = {'folder': folder, 'frames': 0, 'speed': info['speed']}
+
+            if folder in entries:
+                names = set(os.listdir(os.path.join(self.pet_dir, folder)))
+                while f"{entry['frames']}.png" in names:
+                    entry['frames'] += 1
+
+            if entry['frames'] == 0:
+                path = find_animation_file(self.pet_dir, folder)
+                if path is not None:
+                    entry['file'] = os.path.basename(path)
+
+            states[state] = entry
+
+        return {
+            'states': states,
+            'mirrors': dict(config.MIRROR_ANIMATIONS),
+            'fallbacks': {state: 'idle' for state in states if state != 'idle'},
+            'atlas': config.ATLAS_INDEX_FILE if config.ATLAS_INDEX_FILE in entries else None,
+            'generated': {'version': self.VERSION, 'config': config_hash(), 'mtimes': {}},
+        }
+
+    def _write(self, data):
+        """
+        寫入自動產生的清單
+
+        新建檔案會改變寵物目錄的 mtime，所以先建立空檔、再記錄 mtime，
+        最後原地寫入內容（覆寫既有檔案不會改變目錄 mtime）。
+        """
+        folders = {'.'} | {info['folder'] for info in data['states'].values()}
+        try:
+            os.makedirs(self.pet_dir, exist_ok=True)
+            open(self.path, 'a').close()
+            data['generated']['mtimes'] = self._stat_dirs(folders)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+            print(f"[AssetManifest] 已產生清單: {self.path}")
+        except Exception as e:
+            data['generated']['mtimes'] = self._stat_dirs(folders)
+            print(f"[AssetManifest] 寫入清單失敗: {e}")
+
+    def _stat_dirs(self, folders):
+        """取得存在的目錄的 mtime"""
+        mtimes = {}
+        for rel in folders:
+            try:
+                mtimes[rel] = os.stat(os.path.join(self.pet_dir, rel)).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def _source_files(self):
+        """清單引用的所有來源檔案（相對路徑，幀數已知，不需探測）"""
+        files = []
+        for info in self.states.values():
+            if 'file' in info:
+                files.append(info['file'])
+                if info['file'].endswith('.sheet.png'):
+                    files.append(info['file'][:-len('.png')] + '.json')
+            else:
+                files.extend(os.path.join(info['folder'], f'{i}.png') for i in range(info['frames']))
+        if self.atlas:
+            files += [self.atlas, config.ATLAS_IMAGE_FILE]
+        return sorted(files)
+
+    def _stat_files(self):
+        """取得來源檔案的 [相對路徑, mtime, 大小]（不存在的檔案記為 None）"""
+        stats = []
+        for rel in self._source_files():
+            try:
+                st = os.stat(os.path.join(self.pet_dir, rel))
+                stats.append([rel, st.st_mtime_ns, st.st_size])
+            except OSError:
+                stats.append([rel, None, None])
+        return stats
+
+    # ─────────────────────────────────────────
+    # 查詢
+    # ─────────────────────────────────────────
+    def signature(self):
+        """
+        清單簽章（供 FrameCache 判斷快取是否失效）
+
+        包含清單內容、目錄 mtime、動畫設定，以及每個來源檔案的 mtime 與大小
+        （原地覆寫的 PNG / GIF 不會改變目錄 mtime）。
+
+        Returns:
+            str: 簽章字串
+        """
+        payload = json.dumps([self.states, self.mirrors, self.fallbacks, self.atlas, self.mtimes,
+                              config_hash(), self._stat_files()],
+                             sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def fallback_for(self, state, has_frames):
+        """
+        沿著替代規則找出第一個有幀的狀態
+
+        Args:
+            state: 沒有幀的狀態
+            has_frames: 判斷狀態是否有幀的函式
+
+        Returns:
+            str: 替代狀態；找不到時回傳 None
+        """
+        seen = {state}
+        target = self.fallbacks.get(state, 'idle')
+        while target not in seen:
+            if has_frames(target):
+                return target
+            seen.add(target)
+            target = self.fallbacks.get(target, 'idle')
+        return None
@@ -128,10 +128,10 @@ class EventSystem(QObject):
         # 應用效果
         effect = event_data.get('effect', {})
         
-        # 狀態變化
-        for stat in ['hunger', 'happiness', 'health', 'energy']:
-            if stat in effect:
-                self.pet_stats.modify_stat(stat, effect[stat])
+        # 狀態變化（合併成一次 stats_changed）
+        self.pet_stats.apply_delta({stat: effect[stat]
+                                    for stat in ['hunger', 'happiness', 'health', 'energy']
+                                    if stat in effect})
         
         # 新增物品
         if 'add_item' in effect:
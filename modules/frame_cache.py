@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+已解碼幀的磁碟快取
+Decoded Frame Cache
+
+將解碼後（含鏡像、idle 替代）的幀以預乘 ARGB32 原始資料寫入單一檔案，
+下次啟動以記憶體映射直接建立 QImage，完全跳過 PNG 解碼與鏡像運算。
+
+檔案格式：
+    MAGIC(8) | 標頭長度 uint32 | 標頭 JSON | 對齊後的原始像素資料...
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from PyQt5.QtGui import QImage
+
+from modules.frame_store import FRAME_FORMAT, frame_key
+
+
+class FrameCache:
+    """管理單一寵物的已解碼幀快取"""
+
+    MAGIC = b'PETFRAME'
+    VERSION = 5
+    ALIGN = 16
+    FORMAT = FRAME_FORMAT
+
+    def __init__(self, manifest, cache_path, device_pixel_ratio=1.0):
+        """
+        初始化幀快取
+
+        Args:
+            manifest: 寵物的 AssetManifest（用於計算失效簽章）
+            cache_path: 快取檔案路徑
+            device_pixel_ratio: 快取幀的裝置像素比（HiDPI 預縮放的幀各自一份快取）
+        """
+        self.manifest = manifest
+        self.cache_path = cache_path
+        self.device_pixel_ratio = device_pixel_ratio
+
+        # 映射中的檔案（QImage 直接引用這塊記憶體，需保持存活）
+        self._file = None
+        self._mmap = None
+
+    def compute_signature(self):
+        """
+        計算來源簽章：素材清單（含來源檔案的 mtime/大小與動畫設定）+ 裝置像素比
+
+        Returns:
+            str: 簽章字串
+        """
+        return f"{self.VERSION}|{self.device_pixel_ratio:g}|{self.manifest.signature()}"
+
+    def load(self):
+        """
+        讀取快取
+
+        Returns:
+            dict: {state: {"frames": [QImage], "speed": int, "durations": [int]}}；
+                  快取不存在或失效時回傳 None（durations 只有單檔動畫才有）
+        """
+        if not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            signature = self.compute_signature()
+            f = open(self.cache_path, 'rb')
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            header = self._read_header(mm)
+            if header is None or header.get('signature') != signature:
+                mm.close()
+                f.close()
+                print("[FrameCache] 快取已過期，將重新解碼")
+                return None
+
+            self._file, self._mmap = f, mm
+            view = memoryview(mm)
+            images = []
+            for offset, width, height, bpl, dpr in header['frames']:
+                data = view[offset:offset + bpl * height]
+                img = QImage(data, width, height, bpl, self.FORMAT)
+                img.setDevicePixelRatio(dpr)
+                images.append(img)
+
+            animations = {}
+            for state, info in header['states'].items():
+                animations[state] = {
+                    "frames": [images[i] for i in info['frames']],
+                    "speed": info['speed'],
+                }
+                if 'durations' in info:
+                    animations[state]["durations"] = info['durations']
+
+            print(f"[FrameCache] 命中快取: {len(images)} 幀 ({self.cache_path})")
+            return animations
+
+        except Exception as e:
+            print(f"[FrameCache] 讀取快取失敗: {e}")
+            return None
+
+    def _read_header(self, mm):
+        """讀取並驗證標頭"""
+        magic_len = len(self.MAGIC)
+        if mm.size() < magic_len + 4 or mm[:magic_len] != self.MAGIC:
+            return None
+
+        (header_len,) = struct.unpack_from('<I', mm, magic_len)
+        start = magic_len + 4
+        header = json.loads(mm[start:start + header_len].decode('utf-8'))
+        if header.get('version') != self.VERSION:
+            return None
+        return header
+
+    def save(self, animations):
+        """
+        寫入快取（內容相同的幀只會存一份）
+
+        Args:
+            animations: {state: {"frames": [QImage], "speed": int, "durations": [int]}}
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            frames = []
+            frame_index = {}
+            states = {}
+            for state, anim in animations.items():
+                indices = []
+                for img in anim["frames"]:
+                    img = img.convertToFormat(self.FORMAT)
+                    key = frame_key(img)
+                    if key not in frame_index:
+                        frame_index[key] = len(frames)
+                        frames.append(img)
+                    indices.append(frame_index[key])
+                states[state] = {"frames": indices, "speed": anim["speed"]}
+                if anim.get("durations"):
+                    states[state]["durations"] = anim["durations"]
+
+            # 先以佔位偏移量估算標頭長度，再回填真正的偏移量
+            header = {
+                'version': self.VERSION,
+                'signature': self.compute_signature(),
+                'frames': [[0, img.width(), img.height(), img.bytesPerLine(), img.devicePixelRatio()]
+                           for img in frames],
+                'states': states,
+            }
+            prefix = len(self.MAGIC) + 4
+            offset = self._align(prefix + len(self._encode_header(header)) + 16 * len(frames))
+            for entry, img in zip(header['frames'], frames):
+                entry[0] = offset
+                offset = self._align(offset + img.bytesPerLine() * img.height())
+
+            header_bytes = self._encode_header(header)
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(self.MAGIC)
+                f.write(struct.pack('<I', len(header_bytes)))
+                f.write(header_bytes)
+                for (frame_offset, _, height, bpl, _), img in zip(header['frames'], frames):
+                    f.write(b'\0' * (frame_offset - f.tell()))
+                    f.write(img.constBits().asstring(bpl * height))
+            os.replace(tmp_path, self.cache_path)
+
+            print(f"[FrameCache] 已寫入快取: {len(frames)} 幀 ({self.cache_path})")
+            return True
+
+        except Exception as e:
+            print(f"[FrameCache] 寫入快取失敗: {e}")
+            return False
+
+    @staticmethod
+    def _encode_header(header):
+        return json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def _align(cls, offset):
+        return (offset + cls.ALIGN - 1) // cls.ALIGN * cls.ALIGN
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+內容定址的幀儲存區
+Content-Addressed Frame Store
+
+以解碼後像素的雜湊值為鍵，每種獨特畫面只保留一個 QPixmap；
+各狀態（甚至不同寵物）只持有引用，常駐記憶體隨獨特美術量成長。
+每個獨特幀同時快取由 alpha 通道算出的點擊區域（QRegion），換幀時直接套用為視窗遮罩。
+"""
+
+import hashlib
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QBitmap, QImage, QPixmap, QRegion
+
+
+FRAME_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+def frame_key(image):
+    """
+    計算幀的內容雜湊
+
+    Args:
+        image: QImage（須為 FRAME_FORMAT）
+
+    Returns:
+        str: 雜湊鍵（含尺寸，避免不同尺寸但位元組相同的碰撞）
+    """
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    digest = hashlib.blake2b(bits, digest_size=16).hexdigest()
+    return f"{image.width()}x{image.height()}@{image.devicePixelRatio():g}:{digest}"
+
+
+def hit_region(image):
+    """
+    由 alpha 通道計算點擊區域（alpha 低於一半的像素不屬於區域，點擊會穿透）
+
+    Args:
+        image: QImage
+
+    Returns:
+        QRegion: 以邏輯像素表示的區域（HiDPI 幀會縮回邏輯尺寸，與視窗座標一致）
+    """
+    alpha = image.createAlphaMask()
+    dpr = image.devicePixelRatio()
+    if dpr != 1:
+        alpha = alpha.scaled(round(image.width() / dpr), round(image.height() / dpr),
+                             Qt.IgnoreAspectRatio, Qt.FastTransformation)
+    return QRegion(QBitmap.fromImage(alpha))
+
+
+class FrameStore:
+    """去重後的 QPixmap 儲存區（引用計數）"""
+
+    def __init__(self):
+        """初始化幀儲存區"""
+        # {key: [QPixmap, 引用數, 位元組數, 點擊區域]}
+        self._entries = {}
+        self.resident_bytes = 0  # 實際常駐的位元組
+        self.referenced_bytes = 0  # 若不去重需要的位元組
+
+    def intern(self, image):
+        """
+        取得與影像內容相同的共用 QPixmap（引用數 +1）
+
+        Args:
+            image: QImage
+
+        Returns:
+            tuple: (key, QPixmap)
+        """
+        if image.format() != FRAME_FORMAT:
+            image = image.convertToFormat(FRAME_FORMAT)
+
+        key = frame_key(image)
+        entry = self._entries.get(key)
+        if entry is None:
+            pixmap = QPixmap.fromImage(image)
+            size = image.sizeInBytes()
+            entry = self._entries[key] = [pixmap, 0, size, hit_region(image)]
+            self.resident_bytes += size
+
+        entry[1] += 1
+        self.referenced_bytes += entry[2]
+        return key, entry[0]
+
+    def region(self, key):
+        """
+        取得幀的點擊區域
+
+        Args:
+            key: intern 回傳的鍵
+
+        Returns:
+            QRegion: 點擊區域；鍵不存在時回傳空區域
+        """
+        entry = self._entries.get(key)
+        return entry[3] if entry is not None else QRegion()
+
+    def release(self, key):
+        """
+        釋放一個引用，引用數歸零時移除 QPixmap
+
+        Args:
+            key: intern 回傳的鍵
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+
+        entry[1] -= 1
+        self.referenced_bytes -= entry[2]
+        if entry[1] <= 0:
+            del self._entries[key]
+            self.resident_bytes -= entry[2]
+
+    def get_stats(self):
+        """
+        取得去重統計
+
+        Returns:
+            dict: 獨特幀數、引用數、常駐位元組與節省的位元組
+        """
+        return {
+            'unique_frames': len(self._entries),
+            'references': sum(entry[1] for entry in self._entries.values()),
+            'resident_bytes': self.resident_bytes,
+            'saved_bytes': self.referenced_bytes - self.resident_bytes,
+        }
+
+    def print_stats(self):
+        """輸出去重統計"""
+        stats = self.get_stats()
+        print(f"[FrameStore] {stats['unique_frames']} 個獨特幀 / {stats['references']} 個引用, "
+              f"常駐 {stats['resident_bytes'] // 1024} KB, 去重節省 {stats['saved_bytes'] // 1024} KB")
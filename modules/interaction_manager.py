@@ -46,9 +46,11 @@ class InteractionManager(QObject):
         food_info = self.inventory.get_item_info(food_id)
 
         if food_info and self.inventory.use_item(food_id):
-            self.pet_stats.modify_stat('hunger', food_info.get('hunger', 20))
-            self.pet_stats.modify_stat('happiness', food_info.get('happiness', 5))
-            self.pet_stats.modify_stat('health', food_info.get('health', 0))
+            self.pet_stats.apply_delta({
+                'hunger': food_info.get('hunger', 20),
+                'happiness': food_info.get('happiness', 5),
+                'health': food_info.get('health', 0),
+            })
 
             self.last_interaction_time['feed'] = time.time()
             print(f"[Interaction] 餵食 → {food_id}")
@@ -63,12 +65,13 @@ class InteractionManager(QObject):
 
         if toy and self.inventory.use_item(toy):
             info = self.inventory.get_item_info(toy)
-            self.pet_stats.modify_stat('happiness', info.get('happiness', 20))
-            self.pet_stats.modify_stat('energy', -abs(info.get('energy', -10)))
+            self.pet_stats.apply_delta({
+                'happiness': info.get('happiness', 20),
+                'energy': -abs(info.get('energy', -10)),
+            })
             print(f"[Interaction] 玩耍 → {toy}")
         else:
-            self.pet_stats.modify_stat('happiness', 10)
-            self.pet_stats.modify_stat('energy', -10)
+            self.pet_stats.apply_delta({'happiness': 10, 'energy': -10})
             print("[Interaction] 玩耍 →（無玩具）")
 
         self.last_interaction_time['play'] = time.time()
@@ -89,8 +92,7 @@ class InteractionManager(QObject):
             print("[Interaction] 清潔冷卻中")
             return
 
-        self.pet_stats.modify_stat('health', 20)
-        self.pet_stats.modify_stat('happiness', 5)
+        self.pet_stats.apply_delta({'health': 20, 'happiness': 5})
         self.last_interaction_time['clean'] = time.time()
         print("[Interaction] 清潔 → +20 健康, +5 快樂")
 
@@ -100,8 +102,7 @@ class InteractionManager(QObject):
             print("[Interaction] 休息冷卻中")
             return
 
-        self.pet_stats.modify_stat('energy', 30)
-        self.pet_stats.modify_stat('happiness', 5)
+        self.pet_stats.apply_delta({'energy': 30, 'happiness': 5})
         self.last_interaction_time['rest'] = time.time()
 
         print("[Interaction] 休息 → +30 精力, +5 快樂")
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+背景寵物載入
+Background Pet Loader
+
+切換寵物時在工作執行緒建立新的 AnimationStore（素材清單、快取、解碼都只產生 QImage，
+QImage 可跨執行緒使用），QPixmap 之後才由 GUI 執行緒分批建立。
+"""
+
+import json
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+import config
+from modules.animation_store import AnimationStore
+
+
+def list_pets():
+    """
+    列出可切換的寵物：素材目錄下的寵物與換色變體（變體素材可在記憶體中生成）
+
+    Returns:
+        list: 寵物名稱
+    """
+    pets = {config.CURRENT_PET}
+    for name in os.listdir(config.ASSETS_DIR):
+        pet_dir = os.path.join(config.ASSETS_DIR, name)
+        if name != 'ui' and os.path.isdir(pet_dir) and _has_frames(pet_dir):
+            pets.add(name)
+
+    try:
+        with open(config.PET_VARIANTS_FILE, 'r', encoding='utf-8') as f:
+            pets.update(json.load(f))
+    except Exception as e:
+        print(f"[PetLoader] 讀取換色變體失敗: {e}")
+
+    return sorted(pets)
+
+
+def _has_frames(pet_dir):
+    """
+    目錄中是否有可用的素材（逐幀 PNG、單檔動畫或圖集），只看檔名不解碼
+
+    Args:
+        pet_dir: 寵物素材目錄
+
+    Returns:
+        bool: 有素材時為 True
+    """
+    for name in os.listdir(pet_dir):
+        path = os.path.join(pet_dir, name)
+        if os.path.isdir(path):
+            if os.path.exists(os.path.join(path, '0.png')):
+                return True
+        elif name.endswith(('.png', '.gif', '.apng')):
+            return True
+    return False
+
+
+class PetLoader(QThread):
+    """在工作執行緒中準備寵物的動畫來源"""
+
+    # 信號：載入完成 (寵物名稱, AnimationStore)
+    loaded = pyqtSignal(str, object)
+    # 信號：載入失敗 (寵物名稱, 錯誤訊息)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, pet, frame_store, device_pixel_ratio=1.0, parent=None):
+        """
+        初始化載入器
+
+        Args:
+            pet: 寵物名稱
+            frame_store: 共用的 FrameStore（工作執行緒不會存取，只交給新的 AnimationStore）
+            device_pixel_ratio: 目前的裝置像素比
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.pet = pet
+        self.frame_store = frame_store
+        self.device_pixel_ratio = device_pixel_ratio
+
+    def run(self):
+        try:
+            store = AnimationStore(
+                os.path.join(config.ASSETS_DIR, self.pet),
+                os.path.join(config.CACHE_DIR, f'{self.pet}.frames'),
+                self.frame_store,
+                device_pixel_ratio=self.device_pixel_ratio)
+            # 沒有 idle（連替代規則都找不到幀）就不能替換，保留目前的寵物
+            if not store.has_frames('idle'):
+                print(f"[PetLoader] 找不到可用的幀: {self.pet}")
+                self.failed.emit(self.pet, "找不到可用的幀")
+                return
+            self.loaded.emit(self.pet, store)
+        except Exception as e:
+            print(f"[PetLoader] 載入寵物失敗: {self.pet} - {e}")
+            self.failed.emit(self.pet, str(e))
@@ -4,22 +4,88 @@
 Pet Stats Management System
 """
 
+import math
 import time
+from contextlib import contextmanager
+from types import MappingProxyType
 from PyQt5.QtCore import QObject, pyqtSignal
 
 
+class StatsRecord:
+    """寵物狀態的緊湊紀錄；version 在任何欄位改變時遞增（由 PetStats 的屬性負責）"""
+    
+    __slots__ = ('hunger', 'happiness', 'health', 'energy',
+                 'level', 'experience', 'exp_to_next_level',
+                 'birth_time', 'age_seconds',
+                 'feed_count', 'play_count', 'pet_count', 'clean_count',
+                 'version')
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+def _record_property(name):
+    """產生讀寫 StatsRecord 欄位的屬性，值真的改變時才遞增版本"""
+    
+    def fget(self):
+        return getattr(self._record, name)
+    
+    def fset(self, value):
+        record = self._record
+        if getattr(record, name) != value:
+            setattr(record, name, value)
+            record.version += 1
+    
+    return property(fget, fset)
+
+
 class PetStats(QObject):
     """管理寵物的所有狀態值"""
     
     # 信號：當狀態改變時發送
-    stats_changed = pyqtSignal(dict)  # 發送所有狀態
-    stat_warning = pyqtSignal(str, int)  # (stat_name, value) 當狀態過低時警告
+    stats_changed = pyqtSignal(object)  # 發送有改變的狀態（唯讀 MappingProxyType，格式同 get_all_stats）
+    stat_warning = pyqtSignal(str, int)  # (stat_name, value) 狀態跌破警告門檻時發送一次
     level_up = pyqtSignal(int)  # (new_level) 升級時發送
     
+    # 狀態互相影響的門檻與速率（每秒）
+    LOW_HUNGER = 20  # 低於此值時健康額外下降
+    LOW_HEALTH = 20  # 低於此值時快樂額外下降
+    LOW_ENERGY = 30  # 低於此值時精力改為恢復
+    PENALTY_RATE = 0.1  # 額外下降速率
+    ENERGY_RECOVERY_RATE = 0.05  # 低精力時的恢復速率
+    
+    # 低狀態警告（只在跌破時發送一次，回升到 WARNING_REARM 以上才會再次警告）
+    WARNING_STATS = ('hunger', 'happiness', 'health', 'energy')
+    WARNING_THRESHOLD = 20
+    WARNING_REARM = 25
+    
+    # 狀態欄位實際存放在 StatsRecord 中
+    hunger = _record_property('hunger')
+    happiness = _record_property('happiness')
+    health = _record_property('health')
+    energy = _record_property('energy')
+    level = _record_property('level')
+    experience = _record_property('experience')
+    exp_to_next_level = _record_property('exp_to_next_level')
+    birth_time = _record_property('birth_time')
+    age_seconds = _record_property('age_seconds')
+    feed_count = _record_property('feed_count')
+    play_count = _record_property('play_count')
+    pet_count = _record_property('pet_count')
+    clean_count = _record_property('clean_count')
+    
     def __init__(self):
         """初始化寵物狀態"""
         super().__init__()
         
+        self._record = StatsRecord()
+        self._snapshot = None  # get_all_stats 的快取
+        self._snapshot_version = -1
+        self._emitted = {}  # 上次發送 stats_changed 時的快照
+        self._batch_depth = 0  # batch() 巢狀層數，大於 0 時延後發送信號
+        self._warned = set()  # 已發出警告、尚未回升的狀態
+        
         # 基礎屬性 (0-100)
         self.hunger = 100  # 飢餓度（越高越飽）
         self.happiness = 100  # 快樂度
@@ -66,42 +132,193 @@ class PetStats(QObject):
         # 更新年齡
         self.age_seconds = current_time - self.birth_time
         
+        # 依經過時間推進（低頻更新或長時間暫停後也與逐秒更新結果相同）
+        self.advance(delta_time)
+        
+        # 發送狀態更新信號（同時檢查低狀態警告）
+        self._emit_changes()
+    
+    def _step(self, dt):
+        """
+        單一時間步的狀態規則
+        
+        Args:
+            dt: 時間步長（秒）
+        """
         # 狀態衰減
-        self.hunger = max(0, self.hunger - self.decay_rates['hunger'] * delta_time)
-        self.happiness = max(0, self.happiness - self.decay_rates['happiness'] * delta_time)
-        self.health = max(0, self.health - self.decay_rates['health'] * delta_time)
+        self.hunger = max(0, self.hunger - self.decay_rates['hunger'] * dt)
+        self.happiness = max(0, self.happiness - self.decay_rates['happiness'] * dt)
+        self.health = max(0, self.health - self.decay_rates['health'] * dt)
         
         # 精力恢復（如果在休息狀態）或消耗
-        if self.energy < 30:  # 低精力時恢復更快
-            self.energy = min(100, self.energy + 0.05 * delta_time)
+        if self.energy < self.LOW_ENERGY:  # 低精力時恢復更快
+            self.energy = min(100, self.energy + self.ENERGY_RECOVERY_RATE * dt)
         else:
-            self.energy = max(0, self.energy - self.decay_rates['energy'] * delta_time)
+            self.energy = max(0, self.energy - self.decay_rates['energy'] * dt)
         
         # 狀態互相影響
-        if self.hunger < 20:  # 太餓影響健康
-            self.health = max(0, self.health - 0.1 * delta_time)
+        if self.hunger < self.LOW_HUNGER:  # 太餓影響健康
+            self.health = max(0, self.health - self.PENALTY_RATE * dt)
         
-        if self.health < 20:  # 不健康影響快樂
-            self.happiness = max(0, self.happiness - 0.1 * delta_time)
+        if self.health < self.LOW_HEALTH:  # 不健康影響快樂
+            self.happiness = max(0, self.happiness - self.PENALTY_RATE * dt)
+    
+    def advance(self, elapsed):
+        """
+        推進 elapsed 秒：整數秒以封閉形式計算（等同逐秒呼叫 _step(1)，
+        只差浮點捨入），不足一秒的餘數再走一次 _step
         
-        # 檢查低狀態警告
-        self._check_warnings()
+        Args:
+            elapsed: 經過的秒數
+        """
+        if elapsed <= 0:
+            return
+        
+        ticks = int(elapsed)
+        if ticks:
+            self._advance_ticks(ticks)
+        if elapsed > ticks:
+            self._step(elapsed - ticks)
+    
+    def _advance_ticks(self, n):
+        """
+        以 O(1) 計算 n 個一秒時間步後的狀態
+        
+        飢餓、健康、快樂只會下降，夾在 0 時等於總下降量後再夾；
+        只需算出額外懲罰從第幾步開始，即可得到各自的分段線性結果。
+        """
+        rates = self.decay_rates
+        
+        # 第 k 步結束時飢餓 < LOW_HUNGER 的第一個 k
+        hunger_start = self._first_tick_below(self.hunger - self.LOW_HUNGER, rates['hunger'])
+        hunger_ticks = max(0, n - hunger_start + 1)
+        
+        # 健康：前段斜率為衰減率，飢餓懲罰開始後再加上懲罰速率
+        health_start = self._ticks_below_with_penalty(
+            self.health - self.LOW_HEALTH, rates['health'], hunger_start)
+        health_ticks = max(0, n - health_start + 1)
+        
+        self.hunger = max(0, self.hunger - rates['hunger'] * n)
+        self.health = max(0, self.health - rates['health'] * n - self.PENALTY_RATE * hunger_ticks)
+        self.happiness = max(0, self.happiness - rates['happiness'] * n
+                             - self.PENALTY_RATE * health_ticks)
+        self.energy = self._energy_after_ticks(self.energy, n)
+    
+    @staticmethod
+    def _first_tick_below(excess, rate):
+        """
+        線性下降的值第一次低於門檻的步數（從 1 起算）
+        
+        Args:
+            excess: 初始值減去門檻
+            rate: 每步下降量
+        
+        Returns:
+            float: 步數；永遠不會低於門檻時回傳 inf
+        """
+        if excess < 0:
+            return 1
+        if rate <= 0:
+            return math.inf
+        return math.floor(round(excess / rate, 9)) + 1  # 先捨入，避免剛好落在門檻時差一步
+    
+    def _ticks_below_with_penalty(self, excess, rate, penalty_start):
+        """
+        先以 rate 下降、第 penalty_start 步起再加上 PENALTY_RATE 時，第一次低於門檻的步數
+        
+        Args:
+            excess: 初始值減去門檻
+            rate: 每步衰減量
+            penalty_start: 懲罰開始的步數（inf 表示不會開始）
+        
+        Returns:
+            float: 步數（從 1 起算）；永遠不會低於門檻時回傳 inf
+        """
+        start = self._first_tick_below(excess, rate)
+        if penalty_start <= start and penalty_start < math.inf:
+            start = max(penalty_start, self._first_tick_below(
+                excess + self.PENALTY_RATE * (penalty_start - 1), rate + self.PENALTY_RATE))
+        return start
+    
+    def ticks_until_below(self, stat_name, threshold):
+        """
+        依目前的衰減率預測狀態下一次跌破門檻的時間（含飢餓、生病的額外懲罰）
+        
+        Args:
+            stat_name: 狀態名稱（hunger, happiness, health, energy）
+            threshold: 門檻
+        
+        Returns:
+            float: 從 last_update 起算的秒數；已低於門檻或不會跌破時回傳 inf
+        """
+        value = getattr(self, stat_name)
+        if value < threshold:
+            return math.inf
+        
+        rates = self.decay_rates
+        if stat_name == 'energy':
+            # 精力降到 LOW_ENERGY 附近就開始恢復，只有門檻高於循環帶下緣時才會跌破
+            if threshold <= self.LOW_ENERGY - rates['energy']:
+                return math.inf
+            return self._first_tick_below(value - threshold, rates['energy'])
+        
+        hunger_start = self._first_tick_below(self.hunger - self.LOW_HUNGER, rates['hunger'])
+        if stat_name == 'hunger':
+            return self._first_tick_below(value - threshold, rates['hunger'])
+        if stat_name == 'health':
+            return self._ticks_below_with_penalty(value - threshold, rates['health'], hunger_start)
         
-        # 發送狀態更新信號
-        self.stats_changed.emit(self.get_all_stats())
+        health_start = self._ticks_below_with_penalty(
+            self.health - self.LOW_HEALTH, rates['health'], hunger_start)
+        return self._ticks_below_with_penalty(value - threshold, rates['happiness'], health_start)
+    
+    def _energy_after_ticks(self, energy, n):
+        """
+        精力在 n 個一秒時間步後的值
+        
+        高於 LOW_ENERGY 時每步下降 down，低於時每步上升 up；
+        進入 [LOW_ENERGY - down, LOW_ENERGY + up) 之後就在帶內循環，
+        相當於以 (down + up) 為週期的旋轉，可直接取餘數。
+        """
+        down = self.decay_rates['energy']
+        up = self.ENERGY_RECOVERY_RATE
+        band_low = self.LOW_ENERGY - down
+        band_high = self.LOW_ENERGY + up
+        
+        if energy >= band_high:
+            if down <= 0:
+                return energy
+            k = math.floor(round((energy - band_high) / down, 9)) + 1  # 落入帶內所需步數
+            if n <= k:
+                return max(0, energy - down * n)
+            energy, n = energy - down * k, n - k
+        elif energy < band_low:
+            k = math.ceil(round((band_low - energy) / up, 9))
+            if n <= k:
+                return min(100, energy + up * n)
+            energy, n = energy + up * k, n - k
+        
+        # 以門檻為原點計算；週期數與步數一樣先捨入再取整，
+        # 避免剛好落在帶邊界時浮點誤差讓 % 回傳接近一整個週期的值
+        period = down + up
+        offset = energy - self.LOW_ENERGY + down - down * n
+        offset -= period * math.floor(round(offset / period, 9))
+        return self.LOW_ENERGY + offset - down
     
     def _check_warnings(self):
-        """檢查狀態是否過低並發出警告"""
-        warning_threshold = 20
-        
-        if self.hunger < warning_threshold:
-            self.stat_warning.emit('hunger', int(self.hunger))
-        if self.happiness < warning_threshold:
-            self.stat_warning.emit('happiness', int(self.happiness))
-        if self.health < warning_threshold:
-            self.stat_warning.emit('health', int(self.health))
-        if self.energy < warning_threshold:
-            self.stat_warning.emit('energy', int(self.energy))
+        """
+        狀態跌破警告門檻時發出一次警告
+        
+        之後要回升到 WARNING_REARM 以上才會重新啟用，避免在門檻附近反覆觸發。
+        """
+        for stat in self.WARNING_STATS:
+            value = getattr(self, stat)
+            if stat in self._warned:
+                if value >= self.WARNING_REARM:
+                    self._warned.discard(stat)
+            elif value < self.WARNING_THRESHOLD:
+                self._warned.add(stat)
+                self.stat_warning.emit(stat, int(value))
     
     def modify_stat(self, stat_name, amount):
         """
@@ -120,7 +337,60 @@ class PetStats(QObject):
         elif stat_name == 'energy':
             self.energy = max(0, min(100, self.energy + amount))
         
-        self.stats_changed.emit(self.get_all_stats())
+        self._emit_changes()
+    
+    def apply_delta(self, deltas):
+        """
+        一次套用多個狀態變化，只發送一次 stats_changed
+        
+        Args:
+            deltas: {狀態名稱: 變化量}
+        """
+        with self.batch():
+            for stat_name, amount in deltas.items():
+                self.modify_stat(stat_name, amount)
+    
+    @contextmanager
+    def batch(self):
+        """
+        批次修改：區塊內的修改結束時才合併發送一次 stats_changed（可巢狀）；
+        區塊內發生例外時還原成進入前的狀態，不發送信號
+        """
+        if self._batch_depth == 0:
+            saved = [getattr(self._record, name) for name in StatsRecord.__slots__]
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            if self._batch_depth == 1:
+                version = self._record.version
+                for name, value in zip(StatsRecord.__slots__, saved):
+                    setattr(self._record, name, value)
+                self._record.version = version + 1  # 版本只增不減，避免誤用舊快照
+            raise
+        finally:
+            self._batch_depth -= 1
+        
+        if self._batch_depth == 0:
+            self._emit_changes()
+    
+    def _emit_changes(self):
+        """發送自上次發送以來有改變的狀態（批次中則延後），並檢查低狀態警告"""
+        if self._batch_depth:
+            return
+        
+        # 每次修改都套用遲滯：餵食等跳變回升後，下次跌破時才會再次警告
+        self._check_warnings()
+        
+        snapshot = self.get_all_stats()
+        if snapshot is self._emitted:
+            return
+        
+        previous = self._emitted
+        self._emitted = snapshot
+        changed = {key: value for key, value in snapshot.items() if previous.get(key) != value}
+        if changed:
+            self.stats_changed.emit(MappingProxyType(changed))
     
     def add_experience(self, amount):
         """
@@ -141,26 +411,30 @@ class PetStats(QObject):
     
     def get_all_stats(self):
         """
-        取得所有狀態
+        取得所有狀態（同一版本的狀態只建立一次快照，所有讀取者共用）
         
         Returns:
-            dict: 包含所有狀態的字典
+            MappingProxyType: 包含所有狀態的唯讀字典
         """
-        return {
-            'hunger': int(self.hunger),
-            'happiness': int(self.happiness),
-            'health': int(self.health),
-            'energy': int(self.energy),
-            'level': self.level,
-            'experience': self.experience,
-            'exp_to_next_level': self.exp_to_next_level,
-            'age_days': self.age_seconds / 86400,  # 轉換為天數
-            'age_hours': self.age_seconds / 3600,  # 轉換為小時
-            'feed_count': self.feed_count,
-            'play_count': self.play_count,
-            'pet_count': self.pet_count,
-            'clean_count': self.clean_count
-        }
+        record = self._record
+        if self._snapshot_version != record.version:
+            self._snapshot = MappingProxyType({
+                'hunger': int(record.hunger),
+                'happiness': int(record.happiness),
+                'health': int(record.health),
+                'energy': int(record.energy),
+                'level': record.level,
+                'experience': record.experience,
+                'exp_to_next_level': record.exp_to_next_level,
+                'age_days': record.age_seconds / 86400,  # 轉換為天數
+                'age_hours': record.age_seconds / 3600,  # 轉換為小時
+                'feed_count': record.feed_count,
+                'play_count': record.play_count,
+                'pet_count': record.pet_count,
+                'clean_count': record.clean_count
+            })
+            self._snapshot_version = record.version
+        return self._snapshot
     
     def to_dict(self):
         """
@@ -178,6 +452,7 @@ class PetStats(QObject):
             'experience': self.experience,
             'exp_to_next_level': self.exp_to_next_level,
             'birth_time': self.birth_time,
+            'last_update': self.last_update,
             'feed_count': self.feed_count,
             'play_count': self.play_count,
             'pet_count': self.pet_count,
@@ -204,5 +479,13 @@ class PetStats(QObject):
         self.pet_count = data.get('pet_count', 0)
         self.clean_count = data.get('clean_count', 0)
         
-        self.last_update = time.time()
+        # 離線期間的變化一次補上
+        now = time.time()
+        self.last_update = data.get('last_update', now)
+        offline = now - self.last_update
+        self.last_update = now
+        self.age_seconds = now - self.birth_time
+        if offline > 0:
+            self.advance(offline)
+            print(f"[PetStats] 補算離線 {offline / 3600:.1f} 小時的狀態變化")
         print("[PetStats] 從存檔載入狀態完成")
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+批次寵物狀態引擎
+Vectorized Pet Stats Engine
+
+以 NumPy 陣列（struct-of-arrays）保存 N 隻寵物的飢餓、快樂、健康、精力與衰減率，
+衰減、恢復與互相影響的規則以向量化遮罩一次套用到所有寵物。
+規則常數直接取自 PetStats，兩者的結果一致。
+
+PetStatsView 不是完整的 PetStats 替身，只涵蓋互動、事件與存檔會用到的部分：
+狀態與成長欄位、modify_stat、apply_delta、batch、add_experience、get_all_stats、
+to_dict、from_dict。差異如下：
+    - 沒有 Qt 信號（stats_changed、stat_warning、level_up）；
+      需要通知時由呼叫端比較 get_all_stats，或依 add_experience 的回傳值自行處理升級
+    - 沒有 update / advance：所有寵物共用一個時鐘，時間只能由整個批次推進
+    - 不做低狀態警告與離線補算
+"""
+
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from modules.pet_stats import PetStats
+
+STATS = ('hunger', 'happiness', 'health', 'energy')
+DEFAULT_DECAY_RATES = {
+    'hunger': 0.05,
+    'happiness': 0.03,
+    'health': 0.02,
+    'energy': 0.04,
+}
+
+
+class PetStatsBatch:
+    """N 隻寵物的狀態陣列"""
+
+    def __init__(self, count=0):
+        """
+        初始化批次狀態
+
+        Args:
+            count: 預先建立的寵物數量（狀態皆為 100）
+        """
+        self.hunger = np.full(count, 100.0)
+        self.happiness = np.full(count, 100.0)
+        self.health = np.full(count, 100.0)
+        self.energy = np.full(count, 100.0)
+        self.decay_rates = {stat: np.full(count, rate) for stat, rate in DEFAULT_DECAY_RATES.items()}
+
+        self.last_update = time.time()
+        self._views = [PetStatsView(self, i) for i in range(count)]
+
+    def __len__(self):
+        return len(self.hunger)
+
+    def __getitem__(self, index):
+        """取得單一寵物的檢視"""
+        return self._views[index]
+
+    def add(self, stats=None):
+        """
+        加入一隻寵物（大量加入時請改用建構子預先配置）
+
+        Args:
+            stats: 要複製的 PetStats 或 dict（to_dict 格式），預設為全新的寵物
+
+        Returns:
+            PetStatsView: 新寵物的檢視
+        """
+        for stat in STATS:
+            setattr(self, stat, np.append(getattr(self, stat), 100.0))
+        for stat, rate in DEFAULT_DECAY_RATES.items():
+            self.decay_rates[stat] = np.append(self.decay_rates[stat], rate)
+
+        view = PetStatsView(self, len(self._views))
+        self._views.append(view)
+        if isinstance(stats, dict):
+            view.from_dict(stats)
+        elif stats is not None:
+            view.from_dict(stats.to_dict())
+            for stat, rate in stats.decay_rates.items():
+                view.decay_rates[stat] = rate
+        return view
+
+    # ─────────────────────────────────────────
+    # 更新
+    # ─────────────────────────────────────────
+    def update(self, now=None):
+        """
+        依經過時間推進所有寵物（對應 PetStats.update，不發送信號）
+
+        Args:
+            now: 目前時間戳，預設為 time.time()
+        """
+        now = time.time() if now is None else now
+        elapsed = now - self.last_update
+        self.last_update = now
+        self.advance(elapsed)
+
+    def step(self, dt):
+        """
+        所有寵物走一個時間步（與 PetStats._step 相同的規則）
+
+        Args:
+            dt: 時間步長（秒），可為純量或每隻寵物一個值的陣列
+        """
+        rates = self.decay_rates
+        np.maximum(self.hunger - rates['hunger'] * dt, 0, out=self.hunger)
+        np.maximum(self.happiness - rates['happiness'] * dt, 0, out=self.happiness)
+        np.maximum(self.health - rates['health'] * dt, 0, out=self.health)
+
+        low_energy = self.energy < PetStats.LOW_ENERGY
+        self.energy[:] = np.where(low_energy,
+                                  np.minimum(self.energy + PetStats.ENERGY_RECOVERY_RATE * dt, 100),
+                                  np.maximum(self.energy - rates['energy'] * dt, 0))
+
+        hungry = self.hunger < PetStats.LOW_HUNGER
+        np.maximum(self.health - PetStats.PENALTY_RATE * dt * hungry, 0, out=self.health)
+
+        sick = self.health < PetStats.LOW_HEALTH
+        np.maximum(self.happiness - PetStats.PENALTY_RATE * dt * sick, 0, out=self.happiness)
+
+    def advance(self, elapsed):
+        """
+        推進 elapsed 秒：整數秒以封閉形式計算（與 PetStats.advance 相同），餘數再走一步
+
+        Args:
+            elapsed: 經過的秒數（所有寵物共用）
+        """
+        if elapsed <= 0 or len(self) == 0:
+            return
+
+        ticks = int(elapsed)
+        if ticks:
+            self._advance_ticks(ticks)
+        if elapsed > ticks:
+            self.step(elapsed - ticks)
+
+    def _advance_ticks(self, n):
+        """以封閉形式計算 n 個一秒時間步（見 PetStats._advance_ticks）"""
+        rates = self.decay_rates
+        penalty = PetStats.PENALTY_RATE
+
+        hunger_start = _first_tick_below(self.hunger - PetStats.LOW_HUNGER, rates['hunger'])
+        hunger_ticks = np.maximum(n - hunger_start + 1, 0)
+
+        health_start = _first_tick_below(self.health - PetStats.LOW_HEALTH, rates['health'])
+        with np.errstate(invalid='ignore'):
+            late_start = np.maximum(hunger_start, _first_tick_below(
+                self.health - PetStats.LOW_HEALTH + penalty * (hunger_start - 1),
+                rates['health'] + penalty))
+        health_start = np.where(health_start < hunger_start, health_start, late_start)
+        health_ticks = np.maximum(n - health_start + 1, 0)
+
+        np.maximum(self.hunger - rates['hunger'] * n, 0, out=self.hunger)
+        np.maximum(self.health - rates['health'] * n - penalty * hunger_ticks, 0, out=self.health)
+        np.maximum(self.happiness - rates['happiness'] * n - penalty * health_ticks, 0,
+                   out=self.happiness)
+        self.energy[:] = self._energy_after_ticks(n)
+
+    def _energy_after_ticks(self, n):
+        """精力的封閉形式（見 PetStats._energy_after_ticks）"""
+        energy = self.energy
+        down = self.decay_rates['energy']
+        up = PetStats.ENERGY_RECOVERY_RATE
+        low = PetStats.LOW_ENERGY
+        band_low, band_high = low - down, low + up
+
+        above = energy >= band_high
+        below = energy < band_low
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_down = np.where(down > 0, np.floor(np.round((energy - band_high) / down, 9)) + 1, np.inf)
+        k_up = np.ceil(np.round((band_low - energy) / up, 9))
+        k = np.where(above, k_down, np.where(below, k_up, 0))
+
+        linear = np.where(above, np.maximum(energy - down * n, 0), np.minimum(energy + up * n, 100))
+        with np.errstate(invalid='ignore'):
+            entered = np.where(above, energy - down * k, np.where(below, energy + up * k, energy))
+            period = down + up
+            offset = entered - low + down - down * (n - k)
+            offset = offset - period * np.floor(np.round(offset / period, 9))
+            rotated = low + offset - down
+        return np.where((above | below) & (n <= k), linear, rotated)
+
+
+def _first_tick_below(excess, rate):
+    """線性下降的值第一次低於門檻的步數（見 PetStats._first_tick_below）"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ticks = np.where(rate > 0, np.floor(np.round(excess / rate, 9)) + 1, np.inf)
+    return np.where(excess < 0, 1, ticks)
+
+
+def _stat_property(name):
+    """產生讀寫批次陣列中單一元素的屬性"""
+
+    def fget(self):
+        return float(getattr(self._batch, name)[self._index])
+
+    def fset(self, value):
+        getattr(self._batch, name)[self._index] = value
+
+    return property(fget, fset)
+
+
+class _DecayRatesView:
+    """單一寵物的衰減率（像 dict 一樣讀寫批次陣列）"""
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch, index):
+        self._batch = batch
+        self._index = index
+
+    def __getitem__(self, stat):
+        return float(self._batch.decay_rates[stat][self._index])
+
+    def __setitem__(self, stat, rate):
+        self._batch.decay_rates[stat][self._index] = rate
+
+    def items(self):
+        return [(stat, self[stat]) for stat in self._batch.decay_rates]
+
+
+class PetStatsView:
+    """批次中單一寵物的檢視（只涵蓋 PetStats 的部分 API，見模組說明）"""
+
+    hunger = _stat_property('hunger')
+    happiness = _stat_property('happiness')
+    health = _stat_property('health')
+    energy = _stat_property('energy')
+
+    def __init__(self, batch, index):
+        self._batch = batch
+        self._index = index
+        self.decay_rates = _DecayRatesView(batch, index)
+
+        # 成長、年齡與統計（每次事件才改變，不需要向量化）
+        self.level = 1
+        self.experience = 0
+        self.exp_to_next_level = 100
+        self.birth_time = time.time()
+        self.feed_count = 0
+        self.play_count = 0
+        self.pet_count = 0
+        self.clean_count = 0
+
+    @property
+    def last_update(self):
+        return self._batch.last_update
+
+    @property
+    def age_seconds(self):
+        return max(0, self._batch.last_update - self.birth_time)
+
+    def modify_stat(self, stat_name, amount):
+        """修改特定狀態值（見 PetStats.modify_stat）"""
+        if stat_name in STATS:
+            setattr(self, stat_name, max(0, min(100, getattr(self, stat_name) + amount)))
+
+    def apply_delta(self, deltas):
+        """一次套用多個狀態變化（見 PetStats.apply_delta）"""
+        with self.batch():
+            for stat_name, amount in deltas.items():
+                self.modify_stat(stat_name, amount)
+
+    @contextmanager
+    def batch(self):
+        """批次修改（見 PetStats.batch）：區塊內發生例外時還原成進入前的狀態"""
+        saved = self.to_dict()
+        try:
+            yield self
+        except Exception:
+            self.from_dict(saved)
+            raise
+
+    def add_experience(self, amount):
+        """
+        增加經驗值（見 PetStats.add_experience；沒有 level_up 信號，改以回傳值告知）
+
+        Returns:
+            int: 升了幾級
+        """
+        levels = 0
+        self.experience += amount
+        while self.experience >= self.exp_to_next_level:
+            self.experience -= self.exp_to_next_level
+            self.level += 1
+            self.exp_to_next_level = int(self.exp_to_next_level * 1.5)
+            levels += 1
+        return levels
+
+    def get_all_stats(self):
+        """取得所有狀態（格式同 PetStats.get_all_stats）"""
+        return {
+            'hunger': int(self.hunger),
+            'happiness': int(self.happiness),
+            'health': int(self.health),
+            'energy': int(self.energy),
+            'level': self.level,
+            'experience': self.experience,
+            'exp_to_next_level': self.exp_to_next_level,
+            'age_days': self.age_seconds / 86400,
+            'age_hours': self.age_seconds / 3600,
+            'feed_count': self.feed_count,
+            'play_count': self.play_count,
+            'pet_count': self.pet_count,
+            'clean_count': self.clean_count
+        }
+
+    def to_dict(self):
+        """轉換為字典（格式同 PetStats.to_dict）"""
+        data = {stat: getattr(self, stat) for stat in STATS}
+        data.update({
+            'level': self.level,
+            'experience': self.experience,
+            'exp_to_next_level': self.exp_to_next_level,
+            'birth_time': self.birth_time,
+            'last_update': self.last_update,
+            'feed_count': self.feed_count,
+            'play_count': self.play_count,
+            'pet_count': self.pet_count,
+            'clean_count': self.clean_count
+        })
+        return data
+
+    def from_dict(self, data):
+        """
+        從字典載入（格式同 PetStats.to_dict）
+
+        離線補算由整個批次的 update/advance 負責，這裡只還原數值。
+        """
+        for stat in STATS:
+            setattr(self, stat, data.get(stat, 100))
+        self.level = data.get('level', 1)
+        self.experience = data.get('experience', 0)
+        self.exp_to_next_level = data.get('exp_to_next_level', 100)
+        self.birth_time = data.get('birth_time', time.time())
+        self.feed_count = data.get('feed_count', 0)
+        self.play_count = data.get('play_count', 0)
+        self.pet_count = data.get('pet_count', 0)
+        self.clean_count = data.get('clean_count', 0)
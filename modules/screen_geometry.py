@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+螢幕幾何服務
+Screen Geometry Service
+
+快取所有螢幕可用區域（扣除工作列）的聯集，螢幕增減或變更時才重新計算，
+讓邊界檢查不必每次呼叫 Qt。
+"""
+
+from PyQt5.QtCore import QObject, QRect, pyqtSignal
+
+import config
+
+
+class ScreenGeometry(QObject):
+    """多螢幕可用範圍快取"""
+
+    # 信號：可用範圍改變時發送
+    geometry_changed = pyqtSignal()
+
+    def __init__(self, app, margin=config.SCREEN_MARGIN, parent=None):
+        """
+        初始化螢幕幾何服務
+
+        Args:
+            app: QApplication 實例
+            margin: 離螢幕邊緣的最小距離（像素）
+            parent: 父物件
+        """
+        super().__init__(parent)
+
+        self.app = app
+        self.margin = margin
+        self._bounds = None
+
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self._invalidate)
+        for screen in app.screens():
+            self._watch(screen)
+
+    def _watch(self, screen):
+        screen.geometryChanged.connect(self._invalidate)
+        screen.availableGeometryChanged.connect(self._invalidate)
+
+    def _on_screen_added(self, screen):
+        self._watch(screen)
+        self._invalidate()
+
+    def _invalidate(self, *args):
+        self._bounds = None
+        self.geometry_changed.emit()
+
+    def bounds(self):
+        """
+        取得扣除邊距後的可用範圍
+
+        Returns:
+            tuple: (left, top, right, bottom)，right/bottom 為不含的邊界
+        """
+        if self._bounds is None:
+            union = QRect()
+            for screen in self.app.screens():
+                union = union.united(screen.availableGeometry())
+            m = self.margin
+            self._bounds = (union.left() + m, union.top() + m,
+                            union.left() + union.width() - m, union.top() + union.height() - m)
+        return self._bounds
+
+    def x_range(self, width):
+        """
+        取得視窗左上角 x 的可用範圍
+
+        Args:
+            width: 視窗寬度
+
+        Returns:
+            tuple: (min_x, max_x)
+        """
+        left, _, right, _ = self.bounds()
+        return left, right - width
+
+    def clamp(self, x, y, width, height):
+        """
+        將視窗位置限制在可用範圍內
+
+        Returns:
+            tuple: (x, y)
+        """
+        left, top, right, bottom = self.bounds()
+        x = max(left, min(x, right - width))
+        y = max(top, min(y, bottom - height))
+        return x, y
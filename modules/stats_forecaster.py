@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+狀態門檻預測
+Stats Threshold Forecaster
+
+依目前的衰減率（PetStats.ticks_until_below）算出各狀態下一次跨越門檻的時間，
+只在排程器上保留一個單次喚醒，到期時更新狀態（發出警告、開始懲罰），不必逐秒輪詢。
+單純隨時間衰減不會改變預計時間，只有互動、事件等跳變才會重新排程。
+"""
+
+import math
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from modules.pet_stats import PetStats
+
+
+class StatsForecaster(QObject):
+    """預測狀態跨越門檻的時間"""
+
+    # 信號：預測改變 ({名稱: 預計跨越的時間戳，不會跨越時為 None})
+    forecast_changed = pyqtSignal(object)
+
+    # 預測時間變動小於此秒數時視為相同（整數步與小數步的誤差）
+    TOLERANCE = 1.0
+    # 喚醒稍晚於預測時間，確保到期時已經跨越門檻
+    WAKEUP_SLACK = 0.05
+
+    def __init__(self, pet_stats, scheduler, parent=None):
+        """
+        初始化預測器
+
+        Args:
+            pet_stats: PetStats 實例
+            scheduler: TickScheduler 實例
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.pet_stats = pet_stats
+        self.scheduler = scheduler
+
+        # {名稱: (狀態, 門檻)}：低狀態警告，以及飢餓傷害健康、生病影響快樂的懲罰
+        self.thresholds = {f'{stat}_warning': (stat, PetStats.WARNING_THRESHOLD)
+                           for stat in PetStats.WARNING_STATS}
+        self.thresholds['health_penalty'] = ('hunger', PetStats.LOW_HUNGER)
+        self.thresholds['happiness_penalty'] = ('health', PetStats.LOW_HEALTH)
+
+        self.deadlines = {}
+        self.task = None
+        self.wake_time = None
+
+        pet_stats.stats_changed.connect(self.reschedule)
+        self.reschedule()
+
+    def reschedule(self, *args):
+        """重新預測；預計時間有變化時才發送信號並重排喚醒"""
+        stats = self.pet_stats
+        deadlines = {}
+        for name, (stat, threshold) in self.thresholds.items():
+            ticks = stats.ticks_until_below(stat, threshold)
+            deadlines[name] = None if ticks == math.inf else stats.last_update + ticks
+
+        if any(self._moved(self.deadlines.get(name), deadline)
+               for name, deadline in deadlines.items()):
+            self.deadlines = deadlines
+            self.forecast_changed.emit(dict(deadlines))
+
+        pending = [deadline for deadline in self.deadlines.values() if deadline is not None]
+        wake_time = min(pending) + self.WAKEUP_SLACK if pending else None
+        if self.task is not None and not self._moved(self.wake_time, wake_time):
+            return
+
+        self.scheduler.cancel(self.task)
+        self.task = None
+        self.wake_time = wake_time
+        if wake_time is not None:
+            delay = max(0, wake_time - time.time())
+            self.task = self.scheduler.call_later(delay * 1000, self._on_due, "forecast")
+
+    def _moved(self, old, new):
+        if old is None or new is None:
+            return old is not new
+        return abs(old - new) > self.TOLERANCE
+
+    def _on_due(self):
+        """到達預測時間：更新狀態（邊緣觸發的警告在此發出）後排下一次喚醒"""
+        self.task = None
+        self.pet_stats.update()
+        self.reschedule()
+
+    def seconds_until(self, name):
+        """
+        距離指定門檻被跨越還有幾秒
+
+        Args:
+            name: 門檻名稱（如 'hunger_warning'、'health_penalty'）
+
+        Returns:
+            float: 秒數；不會跨越時回傳 None
+        """
+        deadline = self.deadlines.get(name)
+        return None if deadline is None else max(0, deadline - time.time())
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+主排程器
+Master Tick Scheduler
+
+以最小堆積管理所有週期/單次任務的截止時間，只用一個 QTimer 等待
+最近的截止時間；容許誤差內到期的任務合併在同一次喚醒中執行。
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+import config
+
+
+class TickTask:
+    """排程中的任務（由 TickScheduler 建立）"""
+
+    __slots__ = ('name', 'callback', 'interval', 'deadline', 'active', 'paused', 'token',
+                 'calls', 'total_time', 'max_time')
+
+    def __init__(self, name, callback, interval):
+        self.name = name
+        self.callback = callback
+        self.interval = interval  # 秒；None 表示單次任務
+        self.deadline = 0.0
+        self.active = True
+        self.paused = False  # 暫停中的任務不在堆積中，但保留註冊與統計
+        self.token = 0  # 重新排程時遞增，讓堆積中的舊項目失效
+
+        # 耗時統計
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class TickScheduler(QObject):
+    """單一計時器驅動的任務排程器"""
+
+    def __init__(self, tolerance_ms=config.TICK_COALESCE_TOLERANCE, parent=None):
+        """
+        初始化排程器
+
+        Args:
+            tolerance_ms: 合併容許誤差（毫秒），此範圍內到期的任務一起執行
+            parent: 父物件
+        """
+        super().__init__(parent)
+
+        self.tolerance = tolerance_ms / 1000
+        self._heap = []
+        self._seq = itertools.count()
+        self._tasks = []
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+        self.wakeups = 0  # 實際喚醒次數
+        self.started_at = time.monotonic()
+
+    # ─────────────────────────────────────────
+    # 註冊 / 取消
+    # ─────────────────────────────────────────
+    def call_every(self, interval_ms, callback, name=None):
+        """
+        註冊週期任務
+
+        Args:
+            interval_ms: 週期（毫秒）
+            callback: 回呼函式
+            name: 任務名稱（統計用）
+
+        Returns:
+            TickTask: 任務物件
+        """
+        task = TickTask(name or callback.__name__, callback, interval_ms / 1000)
+        self._tasks.append(task)
+        self._schedule(task, time.monotonic() + task.interval)
+        return task
+
+    def call_later(self, delay_ms, callback, name=None):
+        """
+        註冊單次任務
+
+        Args:
+            delay_ms: 延遲（毫秒）
+            callback: 回呼函式
+            name: 任務名稱（統計用）
+
+        Returns:
+            TickTask: 任務物件
+        """
+        task = TickTask(name or callback.__name__, callback, None)
+        self._tasks.append(task)
+        self._schedule(task, time.monotonic() + delay_ms / 1000)
+        return task
+
+    def cancel(self, task):
+        """取消任務（可重複呼叫）"""
+        if task is None or not task.active:
+            return
+        task.active = False
+        task.token += 1
+        self._tasks.remove(task)
+        self._arm()
+
+    def pause(self, task):
+        """暫停週期任務（不再喚醒，直到 resume）"""
+        if not task.active or task.paused:
+            return
+        task.paused = True
+        task.token += 1
+        self._arm()
+
+    def resume(self, task, delay_ms=None):
+        """
+        恢復暫停的任務
+
+        Args:
+            task: 週期任務
+            delay_ms: 距離下一次執行的毫秒數，預設為一個週期
+        """
+        if not task.active or not task.paused:
+            return
+        task.paused = False
+        delay = task.interval if delay_ms is None else delay_ms / 1000
+        self._schedule(task, time.monotonic() + delay)
+
+    def set_interval(self, task, interval_ms):
+        """
+        修改週期任務的間隔，並從現在起重新計時
+
+        Args:
+            task: 週期任務
+            interval_ms: 新的週期（毫秒）
+        """
+        task.interval = interval_ms / 1000
+        if task.active and not task.paused:
+            self._schedule(task, time.monotonic() + task.interval)
+
+    def _schedule(self, task, deadline):
+        task.deadline = deadline
+        task.token += 1
+        heapq.heappush(self._heap, (deadline, next(self._seq), task, task.token))
+        self._arm()
+
+    # ─────────────────────────────────────────
+    # 執行
+    # ─────────────────────────────────────────
+    def _arm(self):
+        """讓唯一的計時器等待最近的有效截止時間"""
+        heap = self._heap
+        while heap and (not heap[0][2].active or heap[0][3] != heap[0][2].token):
+            heapq.heappop(heap)
+
+        if not heap:
+            self._timer.stop()
+            return
+
+        delay = max(0, math.ceil((heap[0][0] - time.monotonic()) * 1000))
+        self._timer.start(delay)
+
+    def _on_timeout(self):
+        """喚醒：執行所有在容許誤差內到期的任務"""
+        self.wakeups += 1
+        now = time.monotonic()
+        horizon = now + self.tolerance
+
+        # 先取出所有到期任務，再逐一執行（避免短週期任務在同一次喚醒中重複執行）
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= horizon:
+            deadline, _, task, token = heapq.heappop(heap)
+            if task.active and token == task.token:
+                due.append(task)
+
+        for task in due:
+            if task.interval is None:
+                task.active = False
+                self._tasks.remove(task)
+            else:
+                # 落後太多時不補跑，直接從現在起算下一次
+                next_deadline = task.deadline + task.interval
+                if next_deadline <= now:
+                    next_deadline = now + task.interval
+                task.deadline = next_deadline
+                task.token += 1
+                heapq.heappush(heap, (next_deadline, next(self._seq), task, task.token))
+
+        for task in due:
+            self._run(task)
+
+        self._arm()
+
+    def _run(self, task):
+        """執行任務並記錄耗時"""
+        start = time.perf_counter()
+        try:
+            task.callback()
+        except Exception as e:
+            print(f"[Scheduler] 任務 {task.name} 發生錯誤: {e}")
+        elapsed = time.perf_counter() - start
+
+        task.calls += 1
+        task.total_time += elapsed
+        task.max_time = max(task.max_time, elapsed)
+
+    # ─────────────────────────────────────────
+    # 統計
+    # ─────────────────────────────────────────
+    def get_stats(self):
+        """
+        取得排程統計
+
+        Returns:
+            dict: 喚醒頻率與各任務耗時
+        """
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            'wakeups': self.wakeups,
+            'wakeups_per_second': self.wakeups / uptime,
+            'tasks': {
+                task.name: {
+                    'calls': task.calls,
+                    'avg_ms': task.total_time / task.calls * 1000 if task.calls else 0,
+                    'max_ms': task.max_time * 1000,
+                }
+                for task in self._tasks
+            },
+        }
+
+    def print_stats(self):
+        """輸出排程統計"""
+        stats = self.get_stats()
+        print(f"[Scheduler] 喚醒 {stats['wakeups']} 次 ({stats['wakeups_per_second']:.2f}/秒)")
+        for name, info in stats['tasks'].items():
+            print(f"  {name}: {info['calls']} 次, 平均 {info['avg_ms']:.3f} ms, 最長 {info['max_ms']:.3f} ms")
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import time
+
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar, QPushButton, QGroupBox, QHBoxLayout, QListWidget, QMessageBox
 from PyQt5.QtCore import pyqtSignal, Qt
 
@@ -44,6 +46,11 @@ class StatusPanel(QWidget):
             layout.addWidget(bar["label"])
             layout.addWidget(bar["bar"])
 
+        # 預測：最快跌破警告門檻的狀態（由 StatsForecaster 提供）
+        self.forecast = {}
+        self.forecast_label = QLabel("")
+        layout.addWidget(self.forecast_label)
+
         group.setLayout(layout)
         return group
 
@@ -139,10 +146,44 @@ class StatusPanel(QWidget):
         for text, bar, value in bars:
             bar["label"].setText(f"{text}: {round(value,2)}/100")
             bar["bar"].setValue(int(value))
+        self.forecast_label.setText(self.format_forecast())
 
         self.update_inventory_list()
         self.repaint()
 
+    def show_forecast(self, deadlines):
+        """
+        接收門檻預測並更新顯示
+
+        Args:
+            deadlines: {名稱: 預計跨越的時間戳或 None}（StatsForecaster.forecast_changed）
+        """
+        self.forecast = deadlines
+        self.forecast_label.setText(self.format_forecast())
+
+    def format_forecast(self):
+        """最快跌破警告門檻的狀態，例如「⏳ 約 12 分鐘後會餓」"""
+        texts = {
+            'hunger_warning': "會餓",
+            'happiness_warning': "不開心",
+            'health_warning': "生病",
+            'energy_warning': "沒精神",
+        }
+        pending = [(deadline, name) for name, deadline in self.forecast.items()
+                   if name in texts and deadline is not None]
+        if not pending:
+            return ""
+
+        deadline, name = min(pending)
+        seconds = max(0, deadline - time.time())
+        if seconds < 60:
+            when = "不到 1 分鐘"
+        elif seconds < 3600:
+            when = f"約 {int(seconds // 60)} 分鐘"
+        else:
+            when = f"約 {seconds / 3600:.1f} 小時"
+        return f"⏳ {when}後{texts[name]}"
+
     def update_inventory_list(self):
         self.inventory_list.clear()
         for item, qty in self.inventory.inventory.items():
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+可見性策略
+Visibility Policy
+
+依 Qt 的 Expose / Show / Hide 事件與應用程式狀態判斷寵物與控制面板是否看得見，
+看不見時主程式暫停繪製相關的工作（動畫、行走、面板刷新），狀態更新改由門檻預測喚醒。
+"""
+
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent, QObject, Qt, pyqtSignal
+
+
+class VisibilityPolicy(QObject):
+    """追蹤寵物視窗與控制面板的可見性"""
+
+    # 信號：寵物可見性改變 (是否可見)
+    pet_visibility_changed = pyqtSignal(bool)
+    # 信號：控制面板可見性改變 (是否可見)
+    panel_visibility_changed = pyqtSignal(bool)
+
+    # 這些應用程式狀態代表畫面上看不到任何東西（Inactive 只是失去焦點，不算）
+    HIDDEN_STATES = (Qt.ApplicationHidden, Qt.ApplicationSuspended)
+
+    def __init__(self, app, pet, panel, parent=None):
+        """
+        初始化可見性策略
+
+        Args:
+            app: QApplication 實例
+            pet: 寵物視窗（須已建立原生視窗）
+            panel: 控制面板
+            parent: 父物件
+        """
+        super().__init__(parent)
+        self.app = app
+        self.pet = pet
+        self.panel = panel
+
+        self.pet_visible = self._pet_is_visible()
+        self.panel_visible = panel.isVisible()
+
+        pet.installEventFilter(self)
+        pet.windowHandle().installEventFilter(self)
+        panel.installEventFilter(self)
+        app.applicationStateChanged.connect(self._update)
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Expose, QEvent.Show, QEvent.Hide):
+            self._update()
+        return False
+
+    def _pet_is_visible(self):
+        return (self.pet.isVisible()
+                and self.pet.windowHandle().isExposed()
+                and self.app.applicationState() not in self.HIDDEN_STATES)
+
+    def _update(self, *args):
+        """重新評估可見性，只在改變時發送信號"""
+        if sip.isdeleted(self.pet):  # 結束時寵物視窗銷毀過程中仍會收到 Hide 事件
+            return
+        pet_visible = self._pet_is_visible()
+        if pet_visible != self.pet_visible:
+            self.pet_visible = pet_visible
+            print(f"[Visibility] 寵物{'可見' if pet_visible else '不可見，暫停繪製'}")
+            self.pet_visibility_changed.emit(pet_visible)
+
+        panel_visible = self.panel.isVisible()
+        if panel_visible != self.panel_visible:
+            self.panel_visible = panel_visible
+            self.panel_visibility_changed.emit(panel_visible)
+
+    @property
+    def anything_visible(self):
+        """寵物或控制面板至少一個看得見"""
+        return self.pet_visible or self.panel_visible
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+素材最佳化：無損 PNG 重新壓縮與調色盤化
+Lossless PNG optimizer for pet assets
+
+顏色數不超過 256 的幀轉成調色盤 PNG（含每色透明度），其餘只重新壓縮；
+寫回前會確認讀回的像素與原圖完全一致，並輸出各狀態的大小與解碼時間報告。
+"""
+
+import argparse
+import io
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+from PyQt5.QtGui import QImage
+
+import config
+from modules.asset_manifest import write_asset
+
+DECODE_REPEAT = 20  # 量測解碼時間的重複次數
+
+
+def palettize(img):
+    """
+    將 RGBA 影像無損轉成調色盤影像
+
+    Args:
+        img: RGBA 影像
+
+    Returns:
+        Image: P 模式影像；顏色超過 256 種時回傳 None
+    """
+    pixels = np.asarray(img)
+    packed = pixels.reshape(-1, 4).copy().view(np.uint32).ravel()
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+
+    rgba = colors.view(np.uint8).reshape(-1, 4)
+    result = Image.fromarray(indices.astype(np.uint8).reshape(pixels.shape[:2]), 'P')
+    result.putpalette(rgba[:, :3].tobytes(), rawmode='RGB')
+    result.info['transparency'] = rgba[:, 3].tobytes()
+    return result
+
+
+def encode(img):
+    """以最高壓縮等級編碼 PNG"""
+    buf = io.BytesIO()
+    save_args = {'format': 'PNG', 'optimize': True}
+    if img.mode == 'P':
+        save_args['transparency'] = img.info['transparency']
+    img.save(buf, **save_args)
+    return buf.getvalue()
+
+
+def decode_time(data):
+    """量測以 Qt 解碼 PNG 的平均時間（秒），與程式啟動時的解碼方式相同"""
+    start = time.perf_counter()
+    for _ in range(DECODE_REPEAT):
+        QImage.fromData(data, 'PNG')
+    return (time.perf_counter() - start) / DECODE_REPEAT
+
+
+def optimize_file(path, dry_run=False):
+    """
+    最佳化單一 PNG
+
+    Returns:
+        dict: 原始/最佳化後的大小與解碼時間
+    """
+    with open(path, 'rb') as f:
+        original = f.read()
+    source = Image.open(io.BytesIO(original))
+
+    # 動畫 PNG（APNG）只會讀到第一幀，重新編碼會丟掉其餘幀，保留原檔
+    if getattr(source, 'n_frames', 1) > 1:
+        print(f"  ↷ 動畫 PNG，略過: {path}")
+        data = original
+    else:
+        source = source.convert('RGBA')
+        expected = source.tobytes()
+
+        candidate = palettize(source) or source
+        data = encode(candidate)
+
+        # 驗證無損：讀回後逐像素比對
+        if Image.open(io.BytesIO(data)).convert('RGBA').tobytes() != expected:
+            print(f"  ⚠ 讀回像素不一致，保留原檔: {path}")
+            data = original
+
+    if len(data) >= len(original):
+        data = original
+    elif not dry_run:
+        def write_data(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+
+        write_asset(path, write_data)
+
+    return {
+        'before': len(original),
+        'after': len(data),
+        'decode_before': decode_time(original),
+        'decode_after': decode_time(data),
+    }
+
+
+def optimize_pet(pet_dir, dry_run=False):
+    """
+    最佳化寵物目錄下所有 PNG 並輸出各狀態報告
+
+    Returns:
+        dict: {狀態: 統計}
+    """
+    report = OrderedDict()
+    for root, dirs, files in os.walk(pet_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith('.png'):
+                continue
+            path = os.path.join(root, name)
+            state = os.path.relpath(root, pet_dir)
+            state = name if state == '.' else state.replace(os.sep, '/')
+
+            result = optimize_file(path, dry_run)
+            total = report.setdefault(state, dict.fromkeys(result, 0))
+            for key, value in result.items():
+                total[key] += value
+
+    print(f"{'狀態':<14}{'原始':>10}{'最佳化':>10}{'節省':>8}{'解碼前(ms)':>12}{'解碼後(ms)':>12}")
+    for state, r in report.items():
+        saved = 1 - r['after'] / r['before'] if r['before'] else 0
+        print(f"{state:<14}{r['before']:>10}{r['after']:>10}{saved:>8.1%}"
+              f"{r['decode_before'] * 1000:>12.3f}{r['decode_after'] * 1000:>12.3f}")
+
+    before = sum(r['before'] for r in report.values())
+    after = sum(r['after'] for r in report.values())
+    if before:
+        print(f"合計: {before} → {after} 位元組（節省 {1 - after / before:.1%}）"
+              + ("（試跑，未寫入）" if dry_run else ""))
+    return report
+
+
+def main():
+    """主程式"""
+    parser = argparse.ArgumentParser(description="無損最佳化寵物素材 PNG")
+    parser.add_argument('pet', nargs='?', default=config.CURRENT_PET, help="寵物名稱")
+    parser.add_argument('--dry-run', action='store_true', help="只輸出報告，不寫回檔案")
+    args = parser.parse_args()
+
+    optimize_pet(os.path.join(config.ASSETS_DIR, args.pet), args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+將寵物的逐幀 PNG 打包成單一圖集
+Pack per-frame sprites into a single atlas image + JSON index
+
+輸出：
+    assets/<pet>/atlas.png   所有幀拼成的一張圖
+    assets/<pet>/atlas.json  索引 {state: {"speed": 毫秒, "rects": [[x, y, w, h], ...]}}
+
+鏡像動畫（清單的 mirrors）與單檔動畫（GIF / APNG / 精靈表）不會打包，
+載入時仍由來源動畫翻轉生成或直接解碼該檔案。
+"""
+
+import json
+import os
+import sys
+
+from PIL import Image
+
+import config
+from modules.asset_manifest import AssetManifest, write_asset
+
+
+def collect_frames(pet_dir):
+    """
+    收集各狀態的幀檔案
+
+    Args:
+        pet_dir: 寵物素材目錄
+
+    Returns:
+        list: [(state, speed, [frame_path, ...]), ...]
+    """
+    manifest = AssetManifest(pet_dir)
+    result = []
+    for state, info in manifest.states.items():
+        if state in manifest.mirrors or 'file' in info:
+            continue
+
+        folder = os.path.join(pet_dir, info['folder'])
+        paths = [os.path.join(folder, f'{i}.png') for i in range(info['frames'])]
+        result.append((state, info['speed'], paths))
+    return result
+
+
+def pack_atlas(pet_dir=config.PET_ASSETS_DIR, max_width=config.ATLAS_MAX_WIDTH):
+    """
+    以貨架（shelf）演算法打包圖集並寫出索引
+
+    Args:
+        pet_dir: 寵物素材目錄
+        max_width: 圖集最大寬度
+
+    Returns:
+        dict: 圖集索引；沒有任何幀時回傳 None
+    """
+    entries = collect_frames(pet_dir)
+    images = []
+    for state, speed, paths in entries:
+        images.append([Image.open(fp).convert('RGBA') for fp in paths])
+
+    if not any(images):
+        print(f"[Atlas] 找不到任何幀: {pet_dir}")
+        return None
+
+    # 依序擺放，每排放滿後換行
+    x = y = shelf_height = atlas_width = 0
+    placements = []
+    for frames in images:
+        rects = []
+        for img in frames:
+            w, h = img.size
+            if x > 0 and x + w > max_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            rects.append([x, y, w, h])
+            x += w
+            shelf_height = max(shelf_height, h)
+            atlas_width = max(atlas_width, x)
+        placements.append(rects)
+
+    atlas = Image.new('RGBA', (atlas_width, y + shelf_height), (0, 0, 0, 0))
+    index = {'image': config.ATLAS_IMAGE_FILE, 'states': {}}
+    for (state, speed, _), frames, rects in zip(entries, images, placements):
+        for img, (rx, ry, _, _) in zip(frames, rects):
+            atlas.paste(img, (rx, ry))
+        index['states'][state] = {'speed': speed, 'rects': rects}
+
+    def write_index(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+
+    write_asset(os.path.join(pet_dir, config.ATLAS_IMAGE_FILE),
+                lambda tmp: atlas.save(tmp, format='PNG'))
+    write_asset(os.path.join(pet_dir, config.ATLAS_INDEX_FILE), write_index)
+
+    total = sum(len(frames) for frames in images)
+    print(f"[Atlas] 已打包 {total} 幀 → {atlas.size[0]}x{atlas.size[1]} ({pet_dir})")
+    return index
+
+
+def main():
+    """主程式：可指定寵物名稱，預設為 config.CURRENT_PET"""
+    pet = sys.argv[1] if len(sys.argv) > 1 else config.CURRENT_PET
+    pack_atlas(os.path.join(config.ASSETS_DIR, pet))
+
+
+if __name__ == "__main__":
+    main()